@@ -1,20 +1,56 @@
 import os
-from fastapi import FastAPI, HTTPException, Depends
+import hmac
+import asyncio
+from datetime import datetime
+from email.utils import formatdate
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException, Depends, Header, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 import logging
 
 from .models import (
     SummarizeRequest, 
     ChatRequest, 
+    PrefetchRequest,
     APIResponse, 
     ChatAPIResponse,
-    SummaryData
+    PrefetchAPIResponse,
+    RefreshAPIResponse,
+    RefreshStats,
+    SummaryData,
+    TenantUsage,
+    TokenUsage
 )
 from .services.openai_service import OpenAIService
 from .services.anthropic_service import AnthropicService
-from .utils.url_parser import validate_input, clean_url
+from .services.stackexchange_service import StackExchangeService
+from .services.scheduler import LLMScheduler, ClientConfig, QuotaExceeded
+from .services.summary_store import SummaryStore, summary_etag
+from .services.summary_export import (
+    EXPORT_FORMATS,
+    InvalidCursor,
+    columnar_formats_available,
+    decode_cursor,
+    iter_export,
+    to_timestamp
+)
+from .services.summary_refresh import (
+    INCREMENTAL,
+    UNCHANGED,
+    ThreadChanges,
+    estimate_full_tokens,
+    estimate_update_tokens,
+    plan_refresh,
+    post_hashes
+)
+from .services.prefetch import PrefetchManager
+from .services.retrieval import ContentIndex
+from .utils.url_parser import validate_input, clean_url, extract_question_id, is_stackoverflow_url
+from .utils.serialization import JSONResponseClass, negotiate_encoding, etag_matches
+from .utils.profiling import ProfilingMiddleware, ProfilingSettings, profile_path, token_matches
+from .utils.token_usage import start_usage_tracking
 
 # Load environment variables
 load_dotenv()
@@ -29,7 +65,8 @@ app = FastAPI(
     description="API for summarizing StackOverflow questions using AI",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=JSONResponseClass
 )
 
 # Configure CORS
@@ -40,8 +77,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Profile-ID", "ETag"],
 )
 
+# Configure request profiling (on-demand via X-Profile header, or sampled)
+profiling_settings = ProfilingSettings()
+app.add_middleware(ProfilingMiddleware, settings=profiling_settings)
+
 # Initialize services
 try:
     openai_service = OpenAIService()
@@ -51,6 +93,41 @@ except Exception as e:
     openai_service = None
     anthropic_service = None
 
+# Structured thread extraction (per-post content and hashes), no API key required
+stackexchange_service = StackExchangeService()
+
+# Stored summaries, served by the cacheable GET endpoint
+summary_store = SummaryStore()
+SUMMARY_CACHE_CONTROL = (
+    f"public, max-age={os.getenv('SUMMARY_CACHE_MAX_AGE', '300')}, "
+    f"stale-while-revalidate={os.getenv('SUMMARY_STALE_WHILE_REVALIDATE', '86400')}"
+)
+
+# Refreshes where at most this share of the thread text changed are merged incrementally
+REFRESH_MAX_DELTA_FRACTION = float(os.getenv("REFRESH_MAX_DELTA_FRACTION", "0.5"))
+
+# Full thread content of summarized questions, retrieved into follow-up chats
+content_index = ContentIndex()
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "4"))
+
+# Fair scheduling of provider capacity across API clients
+llm_scheduler = LLMScheduler()
+
+
+def get_client(
+    request: Request,
+    x_api_key: str | None = Header(default=None)
+) -> ClientConfig:
+    """
+    Identify the calling client by API key or address
+    """
+    client_host = request.client.host if request.client else None
+    return llm_scheduler.identify(x_api_key, client_host)
+
+
+# Speculative summarization of pasted URLs, claimed by the later submit
+prefetch_manager = PrefetchManager(llm_scheduler, lambda request, usage: _summarize(request, usage))
+
 
 @app.get("/")
 async def root():
@@ -77,10 +154,39 @@ async def health_check():
 
 
 @app.post("/api/summarize", response_model=APIResponse)
-async def summarize_question(request: SummarizeRequest):
+async def summarize_question(
+    request: SummarizeRequest,
+    response: Response,
+    client: ClientConfig = Depends(get_client),
+    x_priority: str | None = Header(default=None)
+):
     """
     Summarize a StackOverflow question or technical text
     """
+    question_id = extract_question_id(clean_url(str(request.url))) if request.url else None
+    
+    # Attach to a speculative prefetch of the same question, if any
+    result = await prefetch_manager.claim(question_id)
+    if not result:
+        usage = start_usage_tracking()
+        try:
+            async with llm_scheduler.slot(client, x_priority):
+                result = await _summarize(request, usage)
+        except QuotaExceeded as e:
+            raise HTTPException(status_code=429, detail=str(e))
+        finally:
+            llm_scheduler.record_usage(client, usage)
+    
+    # Stored summaries carry the ETag the client cache revalidates with
+    if question_id and result.success and result.data:
+        response.headers["ETag"] = summary_etag(result.data)
+    return result
+
+
+async def _summarize(request: SummarizeRequest, usage: List[TokenUsage]) -> APIResponse:
+    """
+    Extract the question content and generate its summary
+    """
     try:
         # Validate input
         is_valid, error_message = validate_input(
@@ -98,15 +204,26 @@ async def summarize_question(request: SummarizeRequest):
         title = ""
         content = ""
         tags = []
+        posts = []
         source_url = None
         
         if request.url:
             # Handle URL input
             url = clean_url(str(request.url))
             source_url = url
+            question_id = extract_question_id(url)
+            
+            # Fetch the thread itself; per-post hashes let later refreshes detect changes
+            thread = await stackexchange_service.extract_stackoverflow_content(question_id) if question_id else None
+            
+            if thread and thread["success"]:
+                title = thread["title"]
+                content = thread["content"]
+                tags = thread["tags"]
+                posts = thread["posts"]
             
             # Extract content from StackOverflow
-            if anthropic_service:
+            elif anthropic_service:
                 extraction_result = await anthropic_service.extract_stackoverflow_content(url)
                 
                 if extraction_result["success"]:
@@ -123,7 +240,8 @@ async def summarize_question(request: SummarizeRequest):
                             return APIResponse(
                                 success=True,
                                 data=summary_data,
-                                message="Summary generated by OpenAI fallback."
+                                message="Summary generated by OpenAI fallback.",
+                                usage=usage
                             )
                         except Exception:
                             pass
@@ -154,11 +272,19 @@ async def summarize_question(request: SummarizeRequest):
             # Add source URL if available
             if source_url:
                 summary_data.source_url = source_url
+                
+                question_id = extract_question_id(source_url)
+                if question_id:
+                    await asyncio.to_thread(summary_store.save, question_id, summary_data)
+                    await asyncio.to_thread(summary_store.save_post_hashes, question_id, post_hashes(posts))
+                    await asyncio.to_thread(content_index.index, question_id, f"{title}\n\n{content}")
+                    prefetch_manager.invalidate(question_id)
             
             return APIResponse(
                 success=True,
                 data=summary_data,
-                message="Summary generated successfully"
+                message="Summary generated successfully",
+                usage=usage
             )
         else:
             return APIResponse(
@@ -174,11 +300,66 @@ async def summarize_question(request: SummarizeRequest):
         )
 
 
+@app.post("/api/prefetch", response_model=PrefetchAPIResponse)
+async def prefetch_summary(request: PrefetchRequest, client: ClientConfig = Depends(get_client)):
+    """
+    Start summarizing a pasted StackOverflow URL before it is submitted
+    """
+    url = clean_url(str(request.url))
+    question_id = extract_question_id(url)
+    
+    if not is_stackoverflow_url(url) or not question_id:
+        return PrefetchAPIResponse(
+            success=False,
+            error="Please provide a valid StackOverflow question URL"
+        )
+    
+    if not openai_service or not anthropic_service:
+        return PrefetchAPIResponse(
+            success=False,
+            question_id=question_id,
+            error="AI services not available"
+        )
+    
+    status = prefetch_manager.start(question_id, url, client)
+    if status == "rejected":
+        return PrefetchAPIResponse(
+            success=False,
+            status=status,
+            question_id=question_id,
+            error="Prefetch capacity or token budget exhausted; the question is summarized on submit"
+        )
+    
+    return PrefetchAPIResponse(
+        success=True,
+        status=status,
+        question_id=question_id
+    )
+
+
 @app.post("/api/chat", response_model=ChatAPIResponse)
-async def chat_with_ai(request: ChatRequest):
+async def chat_with_ai(
+    request: ChatRequest,
+    client: ClientConfig = Depends(get_client),
+    x_priority: str | None = Header(default=None)
+):
     """
     Send follow-up questions to the AI
     """
+    usage = start_usage_tracking()
+    try:
+        async with llm_scheduler.slot(client, x_priority):
+            return await _chat(request, usage)
+    except QuotaExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    finally:
+        llm_scheduler.record_usage(client, usage)
+
+
+async def _chat(request: ChatRequest, usage: List[TokenUsage]) -> ChatAPIResponse:
+    """
+    Generate the answer to a follow-up question
+    """
     try:
         if not request.message.strip():
             return ChatAPIResponse(
@@ -192,10 +373,17 @@ async def chat_with_ai(request: ChatRequest):
                 error="OpenAI service not available"
             )
         
+        # Ground the answer in the most relevant parts of the original thread
+        excerpts = []
+        if request.question_id:
+            chunks = await asyncio.to_thread(content_index.search, request.question_id, request.message, RETRIEVAL_TOP_K)
+            excerpts = [chunk.render() for chunk in chunks]
+        
         # Generate chat response
         response = await openai_service.chat_response(
             message=request.message,
-            context=request.context
+            context=request.context,
+            excerpts=excerpts
         )
         
         return ChatAPIResponse(
@@ -204,7 +392,8 @@ async def chat_with_ai(request: ChatRequest):
                 "message": response,
                 "context": f"{request.context or ''}\nUser: {request.message}\nAI: {response}"
             },
-            message="Chat response generated successfully"
+            message="Chat response generated successfully",
+            usage=usage
         )
     
     except Exception as e:
@@ -215,6 +404,224 @@ async def chat_with_ai(request: ChatRequest):
         )
 
 
+@app.get("/api/questions/{question_id}/summary", response_model=SummaryData)
+async def get_question_summary(question_id: str, request: Request):
+    """
+    Get the stored summary of a StackOverflow question (cacheable)
+    """
+    stored = await asyncio.to_thread(summary_store.get, question_id)
+    if not stored:
+        raise HTTPException(status_code=404, detail="Summary not found")
+    
+    available = {"gzip": stored.body_gzip, "br": stored.body_br}
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"), available)
+    
+    # Strong ETags must differ between content encodings of the same summary
+    etag = stored.etag if not encoding else f'{stored.etag[:-1]}-{encoding}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": SUMMARY_CACHE_CONTROL,
+        "Last-Modified": formatdate(stored.updated_at, usegmt=True),
+        "Vary": "Accept-Encoding"
+    }
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, stored.etag):
+        return Response(status_code=304, headers=headers)
+    
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    
+    return Response(content=stored.encoded(encoding), media_type="application/json", headers=headers)
+
+
+@app.post("/api/questions/{question_id}/refresh", response_model=RefreshAPIResponse)
+async def refresh_question_summary(
+    question_id: str,
+    client: ClientConfig = Depends(get_client),
+    x_priority: str | None = Header(default=None)
+):
+    """
+    Bring a stored summary up to date with its StackOverflow thread
+    """
+    usage = start_usage_tracking()
+    try:
+        return await _refresh(question_id, client, x_priority, usage)
+    except QuotaExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    finally:
+        llm_scheduler.record_usage(client, usage)
+
+
+async def _refresh(
+    question_id: str,
+    client: ClientConfig,
+    priority: str | None,
+    usage: List[TokenUsage]
+) -> RefreshAPIResponse:
+    """
+    Compare the thread's post hashes with the ones the summary was built from.
+
+    Unchanged threads cost no LLM call, small changes are merged into the
+    existing summary with the update prompt, and anything else is
+    re-summarized in full. A scheduler slot is only held for the LLM call,
+    not for the StackExchange fetch.
+    """
+    try:
+        stored = await asyncio.to_thread(summary_store.get, question_id)
+        if not stored:
+            return RefreshAPIResponse(
+                success=False,
+                error="Summary not found"
+            )
+        
+        thread = await stackexchange_service.extract_stackoverflow_content(question_id)
+        if not thread["success"]:
+            return RefreshAPIResponse(
+                success=False,
+                error=thread["error"]
+            )
+        
+        current = stored.summary
+        posts = thread["posts"]
+        previous = await asyncio.to_thread(summary_store.get_post_hashes, question_id)
+        changes = ThreadChanges(previous, posts)
+        mode = plan_refresh(changes, bool(previous), REFRESH_MAX_DELTA_FRACTION)
+        
+        if mode == UNCHANGED:
+            summary_data = current
+        else:
+            if not openai_service:
+                return RefreshAPIResponse(
+                    success=False,
+                    error="OpenAI service not available"
+                )
+            
+            async with llm_scheduler.slot(client, priority):
+                if mode == INCREMENTAL:
+                    summary_data = await openai_service.update_summary(current, changes.render())
+                else:
+                    summary_data = await openai_service.summarize_content(thread["title"], thread["content"], thread["tags"])
+            summary_data.source_url = current.source_url or f"https://stackoverflow.com/questions/{question_id}"
+            
+            await asyncio.to_thread(summary_store.save, question_id, summary_data)
+            await asyncio.to_thread(summary_store.save_post_hashes, question_id, post_hashes(posts))
+            await asyncio.to_thread(content_index.index, question_id, f"{thread['title']}\n\n{thread['content']}")
+            prefetch_manager.invalidate(question_id)
+        
+        # Savings compare two estimates made the same way; tokens_used is the provider's count
+        estimated_full_tokens = estimate_full_tokens(thread["title"], thread["content"], thread["tags"], summary_data)
+        if mode == UNCHANGED:
+            estimated_tokens = 0
+        elif mode == INCREMENTAL:
+            estimated_tokens = estimate_update_tokens(current, changes, summary_data)
+        else:
+            estimated_tokens = estimated_full_tokens
+        
+        stats = RefreshStats(
+            mode=mode,
+            added_answers=len(changes.added),
+            edited_answers=len(changes.edited),
+            accepted_changed=len(changes.accepted_changed),
+            removed_answers=len(changes.removed),
+            question_changed=changes.question_changed,
+            tokens_used=sum(item.input_tokens + item.output_tokens for item in usage),
+            estimated_tokens=estimated_tokens,
+            estimated_full_tokens=estimated_full_tokens,
+            estimated_tokens_saved=max(estimated_full_tokens - estimated_tokens, 0)
+        )
+        logger.info(
+            f"Refreshed summary of question {question_id}: {mode}, "
+            f"{stats.tokens_used} tokens used, ~{stats.estimated_tokens_saved} saved (estimated)"
+        )
+        
+        return RefreshAPIResponse(
+            success=True,
+            data=summary_data,
+            refresh=stats,
+            message="Summary is up to date" if mode == UNCHANGED else "Summary refreshed successfully",
+            usage=usage
+        )
+    
+    except QuotaExceeded:
+        raise
+    except Exception as e:
+        logger.error(f"Error in refresh endpoint: {str(e)}")
+        return RefreshAPIResponse(
+            success=False,
+            error=f"Internal server error: {str(e)}"
+        )
+
+
+@app.get("/api/summaries/export")
+async def export_summaries(
+    format: str = Query(default="ndjson", pattern="^(ndjson|arrow|parquet)$"),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1),
+    tag: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    changed_since: Optional[datetime] = None
+):
+    """
+    Stream all stored summaries, oldest change first.
+
+    Every record carries a cursor; pass the last one back to resume the
+    export or to fetch only summaries added or changed since then.
+    """
+    if format != "ndjson" and not columnar_formats_available():
+        raise HTTPException(status_code=400, detail=f"{format} export requires pyarrow")
+    
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    rows = summary_store.iter_bodies(
+        after=after,
+        tag=tag,
+        created_from=to_timestamp(created_from),
+        created_to=to_timestamp(created_to),
+        changed_since=to_timestamp(changed_since),
+        limit=limit
+    )
+    
+    # Sync iterators are consumed in the threadpool, so SQLite reads stay off the event loop
+    return StreamingResponse(iter_export(rows, format), media_type=EXPORT_FORMATS[format])
+
+
+@app.get("/api/usage", response_model=List[TenantUsage])
+async def get_usage(
+    client: ClientConfig = Depends(get_client),
+    x_api_key: str | None = Header(default=None)
+):
+    """
+    Usage accounting per tenant (all tenants for the admin key)
+    """
+    admin_key = os.getenv("USAGE_ADMIN_KEY")
+    # compare_digest raises TypeError for non-ASCII str, so compare bytes
+    if admin_key and x_api_key and hmac.compare_digest(x_api_key.encode("utf-8"), admin_key.encode("utf-8")):
+        return llm_scheduler.usage()
+    
+    return llm_scheduler.usage(client.tenant)
+
+
+@app.get("/api/profiles/{profile_id}")
+async def get_profile(profile_id: str, x_profile: str | None = Header(default=None)):
+    """
+    Download a stored request profile (requires the profiling token)
+    """
+    if not token_matches(x_profile, profiling_settings.token):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+    
+    path = profile_path(profiling_settings, profile_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    media_type = "text/html" if profiling_settings.output_format == "html" else "application/json"
+    return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Handle HTTP exceptions"""
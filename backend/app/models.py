@@ -1,4 +1,4 @@
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, HttpUrl, computed_field
 from typing import List, Optional
 from enum import Enum
 
@@ -21,15 +21,21 @@ class SummarizeRequest(BaseModel):
         }
 
 
+class PrefetchRequest(BaseModel):
+    url: HttpUrl
+
+
 class ChatRequest(BaseModel):
     message: str
     context: Optional[str] = None
+    question_id: Optional[str] = None
     
     class Config:
         json_schema_extra = {
             "example": {
                 "message": "Can you explain more about authentication?",
-                "context": "Previous conversation about FastAPI setup"
+                "context": "Previous conversation about FastAPI setup",
+                "question_id": "123456"
             }
         }
 
@@ -43,6 +49,42 @@ class SummaryData(BaseModel):
     source_url: Optional[str] = None
 
 
+class TokenUsage(BaseModel):
+    provider: str
+    model: str
+    prompt: Optional[str] = None
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    cache_write_tokens: int = 0
+    output_tokens: int = 0
+
+    @computed_field
+    @property
+    def uncached_input_tokens(self) -> int:
+        return self.input_tokens - self.cached_input_tokens
+
+
+class TenantUsage(BaseModel):
+    tenant: str
+    priority: str
+    weight: float
+    requests: int
+    rejected: int
+    in_flight: int
+    queued: int
+    average_wait_ms: float
+    input_tokens: int
+    cached_input_tokens: int
+    output_tokens: int
+    tokens_last_minute: int
+    tokens_per_minute_quota: Optional[int] = None
+
+    @computed_field
+    @property
+    def cache_hit_rate(self) -> float:
+        return self.cached_input_tokens / self.input_tokens if self.input_tokens else 0.0
+
+
 class ChatResponse(BaseModel):
     message: str
     context: str
@@ -53,10 +95,40 @@ class APIResponse(BaseModel):
     data: Optional[SummaryData] = None
     message: Optional[str] = None
     error: Optional[str] = None
+    usage: Optional[List[TokenUsage]] = None
 
 
 class ChatAPIResponse(BaseModel):
     success: bool
     data: Optional[ChatResponse] = None
     message: Optional[str] = None
-    error: Optional[str] = None 
\ No newline at end of file
+    error: Optional[str] = None
+    usage: Optional[List[TokenUsage]] = None 
+
+class PrefetchAPIResponse(BaseModel):
+    success: bool
+    status: Optional[str] = None
+    question_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class RefreshStats(BaseModel):
+    mode: str
+    added_answers: int = 0
+    edited_answers: int = 0
+    accepted_changed: int = 0
+    removed_answers: int = 0
+    question_changed: bool = False
+    tokens_used: int = 0
+    estimated_tokens: int = 0
+    estimated_full_tokens: int = 0
+    estimated_tokens_saved: int = 0
+
+
+class RefreshAPIResponse(BaseModel):
+    success: bool
+    data: Optional[SummaryData] = None
+    refresh: Optional[RefreshStats] = None
+    message: Optional[str] = None
+    error: Optional[str] = None
+    usage: Optional[List[TokenUsage]] = None
@@ -0,0 +1,197 @@
+"""
+Versioned prompt templates.
+
+Every template is split into a static prefix (instructions, output schema,
+few-shot examples) and a dynamic suffix holding the per-request content.
+The prefix is sent first and byte-for-byte identical across calls, so
+providers can serve it from their prompt cache: OpenAI caches matching
+prefixes automatically, and Anthropic caches blocks marked with
+``cache_control``. Bump a template's version whenever its prefix changes.
+
+Providers only cache prefixes of at least 1024 tokens. Every prefix here is
+shorter than that (the longest, summarize, is about 470 tokens), so on its
+own none of them is cached; only chat turns whose conversation context
+pushes the stable part past the minimum can be served from the cache.
+"""
+import json
+from typing import List
+
+from .models import SummaryData
+
+
+class PromptTemplate:
+    def __init__(self, name: str, version: int, prefix: str, suffix: str):
+        self.name = name
+        self.version = version
+        self.prefix = prefix.strip()
+        self.suffix = suffix.strip()
+
+    @property
+    def id(self) -> str:
+        return f"{self.name}@v{self.version}"
+
+    def render_suffix(self, **kwargs) -> str:
+        """
+        Fill in the dynamic part of the prompt
+        """
+        return self.suffix.format(**kwargs)
+
+
+SUMMARIZATION_PROMPT = PromptTemplate(
+    name="summarize",
+    version=2,
+    prefix="""
+You are an expert technical summarizer. You analyze StackOverflow questions and produce a comprehensive summary.
+
+Respond with a JSON object with the following structure:
+{
+    "title": "The question title",
+    "summary": "A clear, concise summary of the main problem and solution (2-3 sentences)",
+    "key_points": [
+        "Key point 1 about the solution",
+        "Key point 2 about important considerations",
+        "Key point 3 about best practices"
+    ],
+    "code_samples": [
+        "Relevant code snippet 1",
+        "Relevant code snippet 2"
+    ],
+    "tags": ["tag1", "tag2", "tag3"]
+}
+
+Focus on:
+1. The core problem being solved
+2. The most effective solution(s)
+3. Important technical details
+4. Code examples that demonstrate the solution
+5. Best practices and considerations
+
+Example input:
+Question Title: How do I read a file line by line in Python?
+Tags: python, file-io
+
+Content:
+Question: I want to process a large log file one line at a time without loading it all into memory.
+Answer 1 (accepted): Iterate over the file object inside a with block; it yields lines lazily.
+Answer 2: readlines() works but reads the whole file into a list.
+
+Example output:
+{
+    "title": "How do I read a file line by line in Python?",
+    "summary": "The asker needs to process a large file without loading it into memory. Iterating directly over a file object opened in a with block yields one line at a time and closes the file automatically.",
+    "key_points": [
+        "File objects are lazy iterators over lines",
+        "A with block guarantees the file is closed",
+        "readlines() loads the whole file and should be avoided for large inputs"
+    ],
+    "code_samples": [
+        "with open('app.log') as f:\\n    for line in f:\\n        process(line.rstrip('\\\\n'))"
+    ],
+    "tags": ["python", "file-io"]
+}
+
+Return only valid JSON without any additional text.
+""",
+    suffix="""
+Question Title: {title}
+Tags: {tags}
+
+Content:
+{content}
+""",
+)
+
+
+CHAT_PROMPT = PromptTemplate(
+    name="chat",
+    version=3,
+    prefix="""
+You are a helpful technical assistant. You answer follow-up questions based on the previous conversation about a StackOverflow question.
+
+You may also be given excerpts from the original StackOverflow thread that are relevant to the question. Base details such as code, versions and caveats on those excerpts, and say so when neither the excerpts nor the context cover the question instead of guessing.
+
+Provide a clear, helpful response that:
+1. Directly addresses the user's question
+2. Builds on the previous context if available
+3. Includes relevant technical details
+4. Is concise but informative
+""",
+    suffix="""
+{excerpts}User question: {message}
+""",
+)
+
+# Conversation context is stable across the turns of one chat session, so it
+# is sent as its own block between the instructions and the question and can
+# be cached as well.
+CHAT_CONTEXT_TEMPLATE = "Previous context:\n{context}"
+
+# Retrieved thread excerpts change with every question and go in the suffix
+CHAT_EXCERPTS_TEMPLATE = "Excerpts from the original thread:\n\n{excerpts}\n\n"
+
+
+EXTRACTION_PROMPT = PromptTemplate(
+    name="extract",
+    version=2,
+    prefix="""
+You analyze StackOverflow question URLs and provide a comprehensive summary of the thread.
+
+Include:
+1. The main question/problem
+2. Key solutions and answers
+3. Important code examples
+4. Technical insights and best practices
+
+Format your response as a detailed technical summary that can be used for further processing.
+""",
+    suffix="""
+StackOverflow question URL:
+{url}
+""",
+)
+
+
+SUMMARY_UPDATE_PROMPT = PromptTemplate(
+    name="summary_update",
+    version=1,
+    prefix="""
+You are an expert technical summarizer. You keep an existing summary of a StackOverflow thread up to date as the thread changes.
+
+You are given the current summary as JSON and only the posts that changed since it was written: new answers, edited answers, and answers that were accepted or unaccepted. Return the updated summary as a JSON object with exactly the same structure as the current summary:
+{
+    "title": "The question title",
+    "summary": "A clear, concise summary of the main problem and solution (2-3 sentences)",
+    "key_points": ["Key point 1", "Key point 2"],
+    "code_samples": ["Relevant code snippet 1"],
+    "tags": ["tag1", "tag2"]
+}
+
+Rules:
+1. Keep everything in the current summary that the changes do not affect, with the same wording
+2. Add key points and code samples for material from new or edited answers that is worth knowing
+3. When the accepted answer changed, make the summary reflect the newly accepted solution
+4. Replace content that an edited answer now contradicts
+5. Keep the summary to 2-3 sentences and the key points short
+
+Return only valid JSON without any additional text.
+""",
+    suffix="""
+Question Title: {title}
+Tags: {tags}
+
+Current summary:
+{summary}
+
+Changes since the summary was written:
+{changes}
+""",
+)
+
+
+
+def format_tags(tags: List[str] | None) -> str:
+    return ", ".join(tags) if tags else "Not specified"
+
+
+def format_summary(summary: SummaryData) -> str:
+    return json.dumps(summary.model_dump(exclude={"source_url"}), indent=2)
@@ -1,6 +1,9 @@
 import os
-from typing import Dict, Any
-from anthropic import Anthropic
+from typing import Dict, Any, Optional
+from anthropic import AsyncAnthropic
+from ..models import TokenUsage
+from ..prompts import EXTRACTION_PROMPT
+from ..utils.token_usage import record_usage
 
 
 class AnthropicService:
@@ -9,8 +12,9 @@ class AnthropicService:
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY environment variable is required")
         
-        self.client = Anthropic(api_key=self.api_key)
-        self.model = "claude-3-sonnet-20240229"  # or "claude-3-haiku-20240307" for cost optimization
+        self.client = AsyncAnthropic(api_key=self.api_key)
+        # Prompt caching needs a model that supports it; claude-3-sonnet does not
+        self.model = os.getenv("ANTHROPIC_MODEL", "claude-sonnet-4-20250514")
     
     async def search_and_summarize(self, query: str) -> Dict[str, Any]:
         """
@@ -39,20 +43,11 @@ class AnthropicService:
         """
         try:
             # Use Anthropic to directly analyze the URL
-            prompt = f"""
-            Please analyze this StackOverflow question URL and provide a comprehensive summary:
-            {url}
-            
-            Include:
-            1. The main question/problem
-            2. Key solutions and answers
-            3. Important code examples
-            4. Technical insights and best practices
-            
-            Format your response as a detailed technical summary that can be used for further processing.
-            """
-            
-            enhanced_content = await self._make_anthropic_request(prompt)
+            enhanced_content = await self._make_anthropic_request(
+                EXTRACTION_PROMPT.render_suffix(url=url),
+                system=EXTRACTION_PROMPT.prefix,
+                prompt_id=EXTRACTION_PROMPT.id
+            )
             
             return {
                 "success": True,
@@ -70,12 +65,23 @@ class AnthropicService:
     
 
     
-    async def _make_anthropic_request(self, prompt: str) -> str:
+    async def _make_anthropic_request(self, prompt: str, system: Optional[str] = None, prompt_id: Optional[str] = None) -> str:
         """
         Make a request to Anthropic Claude API
         """
         try:
-            response = self.client.messages.create(
+            request_args = {}
+            if system:
+                # Mark the static instructions as a cacheable prefix
+                request_args["system"] = [
+                    {
+                        "type": "text",
+                        "text": system,
+                        "cache_control": {"type": "ephemeral"}
+                    }
+                ]
+            
+            response = await self.client.messages.create(
                 model=self.model,
                 max_tokens=1000,
                 messages=[
@@ -83,14 +89,35 @@ class AnthropicService:
                         "role": "user",
                         "content": prompt
                     }
-                ]
+                ],
+                **request_args
             )
             
+            record_usage(self._usage_from_response(response.usage, prompt_id))
+            
             return response.content[0].text
             
         except Exception as e:
             raise Exception(f"Anthropic API request failed: {str(e)}")
     
+    def _usage_from_response(self, usage: Any, prompt_id: Optional[str]) -> TokenUsage:
+        """
+        Convert Anthropic usage into TokenUsage
+        """
+        # Anthropic reports cache reads and writes separately from input_tokens
+        cached_tokens = getattr(usage, "cache_read_input_tokens", 0) or 0
+        cache_write_tokens = getattr(usage, "cache_creation_input_tokens", 0) or 0
+        
+        return TokenUsage(
+            provider="anthropic",
+            model=self.model,
+            prompt=prompt_id,
+            input_tokens=usage.input_tokens + cached_tokens + cache_write_tokens,
+            cached_input_tokens=cached_tokens,
+            cache_write_tokens=cache_write_tokens,
+            output_tokens=usage.output_tokens
+        )
+    
     async def get_technical_context(self, topic: str) -> str:
         """
         Get additional technical context for a topic
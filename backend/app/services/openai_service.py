@@ -1,8 +1,10 @@
 import os
 import json
 from typing import List, Dict, Any
-from openai import OpenAI
-from ..models import SummaryData
+from openai import AsyncOpenAI
+from ..models import SummaryData, TokenUsage
+from ..prompts import SUMMARIZATION_PROMPT, SUMMARY_UPDATE_PROMPT, CHAT_PROMPT, CHAT_CONTEXT_TEMPLATE, CHAT_EXCERPTS_TEMPLATE, format_summary, format_tags
+from ..utils.token_usage import record_usage
 
 
 class OpenAIService:
@@ -11,8 +13,9 @@ class OpenAIService:
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
         
-        self.client = OpenAI(api_key=api_key)
-        self.model = "gpt-4-turbo-preview"  # or "gpt-3.5-turbo" for cost optimization
+        self.client = AsyncOpenAI(api_key=api_key)
+        # gpt-4o and newer cache prompt prefixes automatically; gpt-4-turbo does not
+        self.model = os.getenv("OPENAI_MODEL", "gpt-4o")
     
     async def summarize_content(self, title: str, content: str, tags: List[str] | None = None) -> SummaryData:
         """
@@ -20,9 +23,9 @@ class OpenAIService:
         """
         try:
             # Prepare the prompt for summarization
-            prompt = self._create_summarization_prompt(title, content, tags)
+            messages = self._create_summarization_prompt(title, content, tags)
             
-            response = await self._make_openai_request(prompt)
+            response = await self._make_openai_request(messages, SUMMARIZATION_PROMPT.id)
             
             # Parse the response
             summary_data = self._parse_summary_response(response)
@@ -32,105 +35,118 @@ class OpenAIService:
         except Exception as e:
             raise Exception(f"Error in OpenAI summarization: {str(e)}")
     
-    async def chat_response(self, message: str, context: str | None = None) -> str:
+    async def update_summary(self, summary: SummaryData, changes: str) -> SummaryData:
+        """
+        Merge changed thread content into an existing summary
+        """
+        try:
+            messages = self._create_update_prompt(summary, changes)
+            
+            response = await self._make_openai_request(messages, SUMMARY_UPDATE_PROMPT.id)
+            
+            updated = self._parse_summary_response(response)
+            updated.source_url = summary.source_url
+            
+            return updated
+            
+        except Exception as e:
+            raise Exception(f"Error in OpenAI summary update: {str(e)}")
+    
+    async def chat_response(self, message: str, context: str | None = None, excerpts: List[str] | None = None) -> str:
         """
         Generate a chat response for follow-up questions
         """
         try:
-            prompt = self._create_chat_prompt(message, context)
+            messages = self._create_chat_prompt(message, context, excerpts)
             
-            response = await self._make_openai_request(prompt)
+            response = await self._make_openai_request(messages, CHAT_PROMPT.id)
             
             return response.strip()
             
         except Exception as e:
             raise Exception(f"Error in OpenAI chat: {str(e)}")
     
-    def _create_summarization_prompt(self, title: str, content: str, tags: List[str] | None = None) -> str:
+    def _create_summarization_prompt(self, title: str, content: str, tags: List[str] | None = None) -> List[Dict[str, str]]:
         """
         Create a structured prompt for summarization
         """
-        tag_info = f"Tags: {', '.join(tags) if tags else 'Not specified'}"
-        
-        prompt = f"""
-You are an expert technical summarizer. Analyze the following StackOverflow question and provide a comprehensive summary.
-
-Question Title: {title}
-{tag_info}
-
-Content:
-{content}
-
-Please provide a JSON response with the following structure:
-{{
-    "title": "The question title",
-    "summary": "A clear, concise summary of the main problem and solution (2-3 sentences)",
-    "key_points": [
-        "Key point 1 about the solution",
-        "Key point 2 about important considerations",
-        "Key point 3 about best practices"
-    ],
-    "code_samples": [
-        "Relevant code snippet 1",
-        "Relevant code snippet 2"
-    ],
-    "tags": ["tag1", "tag2", "tag3"]
-}}
-
-Focus on:
-1. The core problem being solved
-2. The most effective solution(s)
-3. Important technical details
-4. Code examples that demonstrate the solution
-5. Best practices and considerations
-
-Return only valid JSON without any additional text.
-"""
-        return prompt
+        return [
+            {"role": "system", "content": SUMMARIZATION_PROMPT.prefix},
+            {"role": "user", "content": SUMMARIZATION_PROMPT.render_suffix(
+                title=title,
+                tags=format_tags(tags),
+                content=content
+            )}
+        ]
+    
+    def _create_update_prompt(self, summary: SummaryData, changes: str) -> List[Dict[str, str]]:
+        """
+        Create a prompt that updates a summary from the changed posts only
+        """
+        return [
+            {"role": "system", "content": SUMMARY_UPDATE_PROMPT.prefix},
+            {"role": "user", "content": SUMMARY_UPDATE_PROMPT.render_suffix(
+                title=summary.title,
+                tags=format_tags(summary.tags),
+                summary=format_summary(summary),
+                changes=changes
+            )}
+        ]
     
-    def _create_chat_prompt(self, message: str, context: str | None = None) -> str:
+    def _create_chat_prompt(self, message: str, context: str | None = None, excerpts: List[str] | None = None) -> List[Dict[str, str]]:
         """
         Create a prompt for follow-up questions
         """
-        context_info = f"\nPrevious context: {context}" if context else ""
+        messages = [{"role": "system", "content": CHAT_PROMPT.prefix}]
         
-        prompt = f"""
-You are a helpful technical assistant. Answer the following follow-up question based on the previous conversation about a StackOverflow question.
-
-{context_info}
-
-User question: {message}
-
-Provide a clear, helpful response that:
-1. Directly addresses the user's question
-2. Builds on the previous context if available
-3. Includes relevant technical details
-4. Is concise but informative
-
-Response:
-"""
-        return prompt
+        # Clients send back the context returned by the previous turn, which only
+        # appends to it, so earlier turns stay part of the cached prefix
+        if context:
+            messages.append({"role": "user", "content": CHAT_CONTEXT_TEMPLATE.format(context=context)})
+        
+        excerpt_info = CHAT_EXCERPTS_TEMPLATE.format(excerpts="\n\n".join(excerpts)) if excerpts else ""
+        messages.append({"role": "user", "content": CHAT_PROMPT.render_suffix(excerpts=excerpt_info, message=message)})
+        return messages
     
-    async def _make_openai_request(self, prompt: str) -> str:
+    async def _make_openai_request(self, messages: List[Dict[str, str]], prompt_id: str | None = None) -> str:
         """
         Make a request to OpenAI API
         """
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful technical assistant."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=messages,
                 max_tokens=1000,
                 temperature=0.3
             )
             
+            if response.usage:
+                record_usage(self._usage_from_response(response.usage, prompt_id))
+            
             return response.choices[0].message.content or ""
             
         except Exception as e:
             raise Exception(f"OpenAI API request failed: {str(e)}")
     
+    def _usage_from_response(self, usage: Any, prompt_id: str | None) -> TokenUsage:
+        """
+        Convert OpenAI usage into TokenUsage, including automatically cached prompt tokens
+        """
+        details = getattr(usage, "prompt_tokens_details", None)
+        if isinstance(details, dict):
+            cached_tokens = details.get("cached_tokens", 0)
+        else:
+            cached_tokens = getattr(details, "cached_tokens", 0)
+        
+        return TokenUsage(
+            provider="openai",
+            model=self.model,
+            prompt=prompt_id,
+            input_tokens=usage.prompt_tokens or 0,
+            cached_input_tokens=cached_tokens or 0,
+            output_tokens=usage.completion_tokens or 0
+        )
+    
     def _parse_summary_response(self, response: str) -> SummaryData:
         """
         Parse the OpenAI response into SummaryData
@@ -0,0 +1,157 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from ..models import APIResponse, SummarizeRequest, TokenUsage
+from ..utils.token_usage import start_usage_tracking
+from .scheduler import BULK, ClientConfig, LLMScheduler, QuotaExceeded
+
+logger = logging.getLogger(__name__)
+
+BUDGET_WINDOW_SECONDS = 3600.0
+
+SummarizePipeline = Callable[[SummarizeRequest, List[TokenUsage]], Awaitable[APIResponse]]
+
+
+class PrefetchEntry:
+    def __init__(self, question_id: str, tenant: str):
+        self.question_id = question_id
+        self.tenant = tenant
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.claimed = False
+        self.tokens = 0
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def key(self) -> str:
+        return f"prefetch:{self.question_id}"
+
+
+class PrefetchManager:
+    """
+    Speculative summarization of URLs the user has pasted but not submitted yet.
+
+    Prefetches run at bulk priority, so they only use spare provider
+    capacity. A later submit for the same question claims the prefetch:
+    a queued prefetch is promoted to interactive priority and the submit
+    waits for it instead of starting the pipeline again. Abandoned prefetches
+    are bounded by a global in-flight limit, a per-client limit (a newer
+    prefetch cancels the client's oldest unclaimed one) and an hourly budget
+    of tokens spent on prefetches that were never claimed. A finished
+    prefetch stops being served once the question's summary is saved again.
+    """
+
+    def __init__(self, scheduler: LLMScheduler, summarize: SummarizePipeline):
+        self.scheduler = scheduler
+        self.summarize = summarize
+        self.max_in_flight = int(os.getenv("PREFETCH_MAX_IN_FLIGHT", "4"))
+        self.max_per_client = int(os.getenv("PREFETCH_MAX_PER_CLIENT", "1"))
+        self.wasted_token_budget = int(os.getenv("PREFETCH_WASTED_TOKEN_BUDGET", "200000"))
+        self.result_ttl = float(os.getenv("PREFETCH_RESULT_TTL", "300"))
+
+        self._entries: Dict[str, PrefetchEntry] = {}
+        self._finished: Deque[Tuple[float, PrefetchEntry]] = deque()
+
+    def start(self, question_id: str, url: str, client: ClientConfig) -> str:
+        """
+        Start prefetching a question; returns the prefetch status
+        """
+        self._prune()
+
+        existing = self._entries.get(question_id)
+        if existing:
+            return "in_flight" if existing.finished_at is None else "ready"
+
+        if self._wasted_tokens() >= self.wasted_token_budget:
+            return "rejected"
+
+        client_entries = [e for e in self._in_flight() if e.tenant == client.tenant and not e.claimed]
+        while client_entries and len(client_entries) >= self.max_per_client:
+            # The user moved on to another URL; drop the oldest speculation
+            abandoned = client_entries.pop(0)
+            logger.info(f"Cancelling abandoned prefetch of question {abandoned.question_id}")
+            abandoned.task.cancel()
+            self._entries.pop(abandoned.question_id, None)
+
+        if len(self._in_flight()) >= self.max_in_flight:
+            return "rejected"
+
+        entry = PrefetchEntry(question_id, client.tenant)
+        entry.task = asyncio.create_task(self._run(entry, url, client))
+        self._entries[question_id] = entry
+        return "started"
+
+    async def claim(self, question_id: Optional[str]) -> Optional[APIResponse]:
+        """
+        Attach to a prefetch for this question, if there is a usable one
+        """
+        entry = self._entries.get(question_id) if question_id else None
+        if entry is None or entry.task is None:
+            return None
+
+        if entry.finished_at is not None and time.monotonic() - entry.finished_at > self.result_ttl:
+            return None
+
+        entry.claimed = True
+        self.scheduler.promote(entry.key)
+
+        try:
+            # Shield the prefetch so a disconnecting client does not cancel it
+            response = await asyncio.shield(entry.task)
+        except asyncio.CancelledError:
+            if entry.task.cancelled():
+                return None
+            raise
+
+        return response if response.success else None
+
+    def invalidate(self, question_id: str) -> None:
+        """
+        Drop a finished prefetch whose summary has been superseded
+        """
+        # An in-flight prefetch is kept: it is the one saving, or it will save a newer summary
+        entry = self._entries.get(question_id)
+        if entry is not None and entry.finished_at is not None:
+            del self._entries[question_id]
+
+    async def _run(self, entry: PrefetchEntry, url: str, client: ClientConfig) -> APIResponse:
+        usage = start_usage_tracking()
+        response = None
+        try:
+            async with self.scheduler.slot(client, BULK, key=entry.key):
+                response = await self.summarize(SummarizeRequest(url=url), usage)
+        except QuotaExceeded as e:
+            response = APIResponse(success=False, error=str(e))
+        finally:
+            self.scheduler.record_usage(client, usage)
+            entry.tokens = sum(item.input_tokens + item.output_tokens for item in usage)
+            entry.finished_at = time.monotonic()
+            self._finished.append((entry.finished_at, entry))
+
+            # Failed prefetches are not kept, so the next submit or prefetch retries
+            if (response is None or not response.success) and self._entries.get(entry.question_id) is entry:
+                del self._entries[entry.question_id]
+
+        return response
+
+    def _in_flight(self) -> List[PrefetchEntry]:
+        return [e for e in self._entries.values() if e.finished_at is None]
+
+    def _wasted_tokens(self) -> int:
+        return sum(entry.tokens for _, entry in self._finished if not entry.claimed)
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        while self._finished and now - self._finished[0][0] > BUDGET_WINDOW_SECONDS:
+            self._finished.popleft()
+
+        expired = [
+            question_id for question_id, entry in self._entries.items()
+            if entry.finished_at is not None and now - entry.finished_at > self.result_ttl
+        ]
+        for question_id in expired:
+            del self._entries[question_id]
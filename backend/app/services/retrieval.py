@@ -0,0 +1,254 @@
+import os
+import re
+import math
+import sqlite3
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # pragma: no cover - embeddings are optional
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"[A-Za-z0-9_]+")
+SUBWORD_PATTERN = re.compile(r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])")
+CODE_FENCE_PATTERN = re.compile(r"(```.*?```)", re.DOTALL)
+SECTION_PATTERN = re.compile(r"^(Question|Answer\s*\d*[^:\n]{0,40}):", re.IGNORECASE)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens; identifiers are also split on underscores and camelCase
+    """
+    tokens = []
+    for word in WORD_PATTERN.findall(text):
+        tokens.append(word.lower())
+        parts = SUBWORD_PATTERN.findall(word)
+        if len(parts) > 1:
+            tokens.extend(part.lower() for part in parts)
+    return tokens
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough LLM token count (about four characters per token)
+    """
+    return max(1, len(text) // 4)
+
+
+class Chunk:
+    def __init__(self, position: int, section: str, text: str):
+        self.position = position
+        self.section = section
+        self.text = text
+
+    def render(self) -> str:
+        return f"[{self.section}]\n{self.text}"
+
+
+def chunk_content(content: str, max_chars: int = 1200) -> List[Chunk]:
+    """
+    Split extracted thread content into chunks.
+
+    Code blocks are kept whole, paragraphs are packed up to max_chars, and a
+    chunk never spans two posts, so every chunk is labelled with the question
+    or answer it came from. Posts are recognised by their "Question:" and
+    "Answer N (...):" headings; text without them (such as a free-text LLM
+    extraction) is chunked by paragraph under "Question".
+    """
+    chunks: List[Chunk] = []
+    section = "Question"
+    buffer: List[str] = []
+
+    def flush():
+        text = "\n\n".join(buffer).strip()
+        if text:
+            chunks.append(Chunk(len(chunks), section, text))
+        buffer.clear()
+
+    for block in CODE_FENCE_PATTERN.split(content):
+        if block.startswith("```"):
+            if buffer and sum(len(part) for part in buffer) + len(block) > max_chars:
+                flush()
+            buffer.append(block.strip())
+            continue
+
+        for paragraph in re.split(r"\n\s*\n", block):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+
+            match = SECTION_PATTERN.match(paragraph)
+            if match:
+                flush()
+                section = match.group(1).strip()
+
+            if buffer and sum(len(part) for part in buffer) + len(paragraph) > max_chars:
+                flush()
+            buffer.append(paragraph)
+
+    flush()
+    return chunks
+
+
+class BM25Index:
+    def __init__(self, chunks: List[Chunk]):
+        self.chunks = chunks
+        self.term_frequencies = [Counter(tokenize(chunk.text)) for chunk in chunks]
+        self.lengths = [sum(tf.values()) for tf in self.term_frequencies]
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+        document_frequencies: Counter = Counter()
+        for tf in self.term_frequencies:
+            document_frequencies.update(tf.keys())
+
+        count = len(chunks)
+        self.idf = {
+            term: math.log(1 + (count - df + 0.5) / (df + 0.5))
+            for term, df in document_frequencies.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        terms = [term for term in set(tokenize(query)) if term in self.idf]
+        scores = []
+        for tf, length in zip(self.term_frequencies, self.lengths):
+            score = 0.0
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self.average_length or 1))
+            for term in terms:
+                frequency = tf.get(term, 0)
+                if frequency:
+                    score += self.idf[term] * frequency * (BM25_K1 + 1) / (frequency + norm)
+            scores.append(score)
+        return scores
+
+
+class ContentIndex:
+    """
+    Local retrieval index over the extracted content of summarized questions.
+
+    Chunks are persisted next to the summaries in SQLite; BM25 indexes are
+    built on first use and kept in a small LRU. When RETRIEVAL_EMBEDDING_MODEL
+    names a sentence-transformers model (and the package is installed),
+    embedding similarity is fused with BM25 by reciprocal rank fusion.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("SUMMARY_DB_PATH", "summaries.db")
+        self.cache_size = int(os.getenv("RETRIEVAL_INDEX_CACHE_SIZE", "256"))
+        self._lock = threading.Lock()
+        self._indexes: "OrderedDict[str, BM25Index]" = OrderedDict()
+        # Chunk embeddings with the BM25Index whose chunks they were computed from
+        self._embeddings: Dict[str, Tuple[BM25Index, Any]] = {}
+        self._model = None
+
+        model_name = os.getenv("RETRIEVAL_EMBEDDING_MODEL")
+        if model_name:
+            if SentenceTransformer is None:
+                logger.warning("RETRIEVAL_EMBEDDING_MODEL is set but sentence-transformers is not installed")
+            else:
+                self._model = SentenceTransformer(model_name)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS content_chunks (
+                question_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                section TEXT NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (question_id, position)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def index(self, question_id: str, content: str) -> int:
+        """
+        Chunk and store the extracted content of a question; returns the chunk count
+        """
+        chunks = chunk_content(content)
+        with self._lock:
+            self._conn.execute("DELETE FROM content_chunks WHERE question_id = ?", (question_id,))
+            self._conn.executemany(
+                "INSERT INTO content_chunks (question_id, position, section, text) VALUES (?, ?, ?, ?)",
+                [(question_id, chunk.position, chunk.section, chunk.text) for chunk in chunks]
+            )
+            self._conn.commit()
+            self._remember(question_id, BM25Index(chunks))
+            self._embeddings.pop(question_id, None)
+        return len(chunks)
+
+    def search(self, question_id: str, query: str, k: int = 4) -> List[Chunk]:
+        """
+        Return the k chunks most relevant to the query, in thread order
+        """
+        index = self._load(question_id)
+        if index is None or not index.chunks:
+            return []
+
+        ranked = self._rank(index.scores(query), require_positive=True)
+        if self._model is not None:
+            dense_ranked = self._rank(self._dense_scores(question_id, index, query))
+            ranked = self._fuse([ranked, dense_ranked])
+
+        top = sorted(ranked[:k])
+        return [index.chunks[position] for position in top]
+
+    def _load(self, question_id: str) -> Optional[BM25Index]:
+        with self._lock:
+            index = self._indexes.get(question_id)
+            if index is not None:
+                self._indexes.move_to_end(question_id)
+                return index
+
+            rows = self._conn.execute(
+                "SELECT position, section, text FROM content_chunks WHERE question_id = ? ORDER BY position",
+                (question_id,)
+            ).fetchall()
+            if not rows:
+                return None
+
+            index = BM25Index([Chunk(*row) for row in rows])
+            self._remember(question_id, index)
+            return index
+
+    def _remember(self, question_id: str, index: BM25Index) -> None:
+        self._indexes[question_id] = index
+        self._indexes.move_to_end(question_id)
+        while len(self._indexes) > self.cache_size:
+            evicted, _ = self._indexes.popitem(last=False)
+            self._embeddings.pop(evicted, None)
+
+    def _dense_scores(self, question_id: str, index: BM25Index, query: str) -> List[float]:
+        with self._lock:
+            cached = self._embeddings.get(question_id)
+        if cached is not None and cached[0] is index:
+            embeddings = cached[1]
+        else:
+            # Encode outside the lock; a re-index meanwhile leaves a different index cached
+            embeddings = self._model.encode([chunk.text for chunk in index.chunks], normalize_embeddings=True)
+            with self._lock:
+                if self._indexes.get(question_id) is index:
+                    self._embeddings[question_id] = (index, embeddings)
+
+        query_embedding = self._model.encode([query], normalize_embeddings=True)[0]
+        return (embeddings @ query_embedding).tolist()
+
+    def _rank(self, scores: List[float], require_positive: bool = False) -> List[int]:
+        positions = [i for i, score in enumerate(scores) if score > 0 or not require_positive]
+        return sorted(positions, key=lambda i: scores[i], reverse=True)
+
+    def _fuse(self, rankings: List[List[int]]) -> List[int]:
+        fused: Dict[int, float] = {}
+        for ranking in rankings:
+            for rank, position in enumerate(ranking):
+                fused[position] = fused.get(position, 0.0) + 1.0 / (RRF_K + rank + 1)
+        return sorted(fused, key=fused.get, reverse=True)
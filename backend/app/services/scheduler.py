@@ -0,0 +1,327 @@
+import os
+import json
+import time
+import heapq
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, List, Optional, Tuple
+
+from ..models import TenantUsage, TokenUsage
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+PRIORITY_CLASSES = [INTERACTIVE, BULK]
+
+QUOTA_WINDOW_SECONDS = 60.0
+ANONYMOUS_PREFIX = "anonymous:"
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+class ClientConfig:
+    def __init__(
+        self,
+        tenant: str,
+        priority: str = INTERACTIVE,
+        weight: float = 1.0,
+        max_concurrency: int = 4,
+        tokens_per_minute: Optional[int] = None
+    ):
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        self.tenant = tenant
+        self.priority = priority
+        self.weight = max(float(weight), 0.01)
+        self.max_concurrency = max(int(max_concurrency), 1)
+        self.tokens_per_minute = tokens_per_minute
+
+
+def load_client_configs() -> Dict[str, ClientConfig]:
+    """
+    Load per-API-key client settings from the CLIENT_API_KEYS environment variable.
+
+    The value is a JSON object mapping API keys to client settings, e.g.
+    {"key-123": {"tenant": "importer", "priority": "bulk", "weight": 1,
+                 "max_concurrency": 2, "tokens_per_minute": 200000}}
+    """
+    raw = os.getenv("CLIENT_API_KEYS")
+    if not raw:
+        return {}
+
+    try:
+        return {key: ClientConfig(**settings) for key, settings in json.loads(raw).items()}
+    except (ValueError, TypeError) as e:
+        logger.error(f"Invalid CLIENT_API_KEYS configuration: {str(e)}")
+        return {}
+
+
+def default_client_config(tenant: str) -> ClientConfig:
+    """
+    Settings for clients without an API key (the web UI, keyed by client ID or IP)
+    """
+    tokens_per_minute = os.getenv("DEFAULT_TOKENS_PER_MINUTE")
+    return ClientConfig(
+        tenant=tenant,
+        priority=INTERACTIVE,
+        weight=float(os.getenv("DEFAULT_CLIENT_WEIGHT", "1")),
+        max_concurrency=int(os.getenv("DEFAULT_CLIENT_MAX_CONCURRENCY", "2")),
+        tokens_per_minute=int(tokens_per_minute) if tokens_per_minute else None
+    )
+
+
+class _TenantState:
+    def __init__(self, config: ClientConfig):
+        self.config = config
+        self.last_finish = 0.0
+        self.in_flight = 0
+        self.queued = 0
+        self.requests = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.input_tokens = 0
+        self.cached_input_tokens = 0
+        self.output_tokens = 0
+        self.recent_tokens: Deque[Tuple[float, int]] = deque()
+        self.last_active = time.monotonic()
+
+    def tokens_in_window(self, now: float) -> int:
+        while self.recent_tokens and now - self.recent_tokens[0][0] > QUOTA_WINDOW_SECONDS:
+            self.recent_tokens.popleft()
+        return sum(tokens for _, tokens in self.recent_tokens)
+
+
+class _Waiter:
+    def __init__(self, tenant: _TenantState, priority: str, start_tag: float, finish_tag: float, key: Optional[str]):
+        self.tenant = tenant
+        self.priority = priority
+        self.key = key
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class LLMScheduler:
+    """
+    Weighted fair queuing in front of the LLM provider calls.
+
+    Interactive requests are always dispatched before bulk ones, and
+    RESERVED_INTERACTIVE_SLOTS of the global concurrency are never handed to
+    bulk work, so a batch job cannot occupy every slot. Within a priority
+    class, tenants share capacity in proportion to their weight (start-time
+    fair queuing on virtual finish tags). Each tenant is also capped by its
+    own concurrency limit and an optional tokens-per-minute quota.
+    """
+
+    def __init__(self):
+        self.max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+        self.reserved_interactive = min(
+            int(os.getenv("RESERVED_INTERACTIVE_SLOTS", "2")),
+            self.max_concurrency - 1
+        )
+        self.clients = load_client_configs()
+        # Anonymous tenants idle for this long are dropped; never shorter than the quota window
+        self.anonymous_idle_seconds = max(
+            float(os.getenv("ANONYMOUS_TENANT_IDLE_SECONDS", "600")),
+            QUOTA_WINDOW_SECONDS
+        )
+        self._last_eviction = time.monotonic()
+
+        self._tenants: Dict[str, _TenantState] = {}
+        self._queue: List[Tuple[int, float, int, _Waiter]] = []
+        self._queued_by_key: Dict[str, _Waiter] = {}
+        self._sequence = 0
+        self._virtual_time = 0.0
+        self._in_flight = 0
+
+    def identify(self, api_key: Optional[str], client_host: Optional[str]) -> ClientConfig:
+        """
+        Resolve the client config for a request.
+
+        Clients without a configured key are keyed on their address, never on
+        a value they choose themselves, so they cannot get a fresh tenant (and
+        fresh limits) per request.
+        """
+        if api_key and api_key in self.clients:
+            return self.clients[api_key]
+
+        return default_client_config(f"{ANONYMOUS_PREFIX}{client_host or 'unknown'}")
+
+    @asynccontextmanager
+    async def slot(self, client: ClientConfig, priority: Optional[str] = None, key: Optional[str] = None):
+        """
+        Wait for a provider slot for this client; release it on exit.
+
+        A keyed request can be moved to the interactive class with promote()
+        while it is still queued.
+        """
+        tenant = self._tenant(client)
+        # Clients may ask for a lower priority than configured, never a higher one
+        if priority not in PRIORITY_CLASSES or (client.priority == BULK and priority == INTERACTIVE):
+            priority = client.priority
+
+        quota = client.tokens_per_minute
+        if quota is not None and tenant.tokens_in_window(time.monotonic()) >= quota:
+            tenant.rejected += 1
+            raise QuotaExceeded(f"Token quota of {quota} tokens per minute exceeded for {client.tenant}")
+
+        waiter = self._enqueue(tenant, priority, key)
+        queued_at = time.monotonic()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was granted just before cancellation; hand it back
+                self._release(tenant)
+            else:
+                tenant.queued -= 1
+            raise
+        finally:
+            if key and self._queued_by_key.get(key) is waiter:
+                del self._queued_by_key[key]
+
+        tenant.wait_seconds += time.monotonic() - queued_at
+        tenant.requests += 1
+        try:
+            yield
+        finally:
+            self._release(tenant)
+
+    def promote(self, key: str) -> bool:
+        """
+        Move a queued request to the interactive class
+        """
+        waiter = self._queued_by_key.get(key)
+        if waiter is None or waiter.future.done() or waiter.priority == INTERACTIVE:
+            return False
+
+        # The old bulk entry stays in the heap and is skipped as stale
+        waiter.priority = INTERACTIVE
+        self._sequence += 1
+        heapq.heappush(self._queue, (PRIORITY_CLASSES.index(INTERACTIVE), waiter.finish_tag, self._sequence, waiter))
+        self._dispatch()
+        return True
+
+    def record_usage(self, client: ClientConfig, usage: List[TokenUsage]) -> None:
+        """
+        Charge the tokens used by a request to its tenant
+        """
+        tenant = self._tenant(client)
+        total = 0
+        for item in usage:
+            tenant.input_tokens += item.input_tokens
+            tenant.cached_input_tokens += item.cached_input_tokens
+            tenant.output_tokens += item.output_tokens
+            total += item.input_tokens + item.output_tokens
+
+        if total:
+            tenant.recent_tokens.append((time.monotonic(), total))
+
+    def usage(self, tenant: Optional[str] = None) -> List[TenantUsage]:
+        """
+        Export usage accounting, for one tenant or all of them
+        """
+        now = time.monotonic()
+        states = [self._tenants[tenant]] if tenant in self._tenants else (
+            [] if tenant else list(self._tenants.values())
+        )
+
+        return [
+            TenantUsage(
+                tenant=state.config.tenant,
+                priority=state.config.priority,
+                weight=state.config.weight,
+                requests=state.requests,
+                rejected=state.rejected,
+                in_flight=state.in_flight,
+                queued=state.queued,
+                average_wait_ms=(state.wait_seconds / state.requests * 1000) if state.requests else 0.0,
+                input_tokens=state.input_tokens,
+                cached_input_tokens=state.cached_input_tokens,
+                output_tokens=state.output_tokens,
+                tokens_last_minute=state.tokens_in_window(now),
+                tokens_per_minute_quota=state.config.tokens_per_minute
+            )
+            for state in states
+        ]
+
+    def _tenant(self, client: ClientConfig) -> _TenantState:
+        now = time.monotonic()
+        tenant = self._tenants.get(client.tenant)
+        if tenant is None:
+            self._evict_idle_anonymous(now)
+            tenant = _TenantState(client)
+            self._tenants[client.tenant] = tenant
+        tenant.last_active = now
+        return tenant
+
+    def _evict_idle_anonymous(self, now: float) -> None:
+        """
+        Drop the state of anonymous tenants with no recent or pending work
+        """
+        if now - self._last_eviction < QUOTA_WINDOW_SECONDS:
+            return
+        self._last_eviction = now
+
+        idle = [
+            name for name, state in self._tenants.items()
+            if name.startswith(ANONYMOUS_PREFIX)
+            and state.in_flight == 0
+            and state.queued == 0
+            and now - state.last_active > self.anonymous_idle_seconds
+        ]
+        for name in idle:
+            del self._tenants[name]
+
+    def _enqueue(self, tenant: _TenantState, priority: str, key: Optional[str]) -> _Waiter:
+        start_tag = max(self._virtual_time, tenant.last_finish)
+        finish_tag = start_tag + 1.0 / tenant.config.weight
+        tenant.last_finish = finish_tag
+        tenant.queued += 1
+
+        waiter = _Waiter(tenant, priority, start_tag, finish_tag, key)
+        if key:
+            self._queued_by_key[key] = waiter
+        self._sequence += 1
+        heapq.heappush(self._queue, (PRIORITY_CLASSES.index(priority), finish_tag, self._sequence, waiter))
+        self._dispatch()
+        return waiter
+
+    def _release(self, tenant: _TenantState) -> None:
+        tenant.in_flight -= 1
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """
+        Grant free slots to the eligible waiters with the smallest finish tags
+        """
+        skipped = []
+        while self._queue and self._in_flight < self.max_concurrency:
+            entry = heapq.heappop(self._queue)
+            waiter = entry[3]
+
+            if waiter.future.done() or entry[0] != PRIORITY_CLASSES.index(waiter.priority):
+                # Cancelled while queued, or a stale entry left by promote()
+                continue
+
+            if waiter.tenant.in_flight >= waiter.tenant.config.max_concurrency or (
+                waiter.priority == BULK and self._in_flight >= self.max_concurrency - self.reserved_interactive
+            ):
+                skipped.append(entry)
+                continue
+
+            self._virtual_time = max(self._virtual_time, waiter.start_tag)
+            waiter.tenant.queued -= 1
+            waiter.tenant.in_flight += 1
+            self._in_flight += 1
+            waiter.future.set_result(None)
+
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
@@ -0,0 +1,154 @@
+import os
+import re
+import html
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+import httpx
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+API_URL = "https://api.stackexchange.com/2.3"
+BLANK_LINES_PATTERN = re.compile(r"\n\s*\n\s*")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def html_to_text(body: str) -> str:
+    """
+    Convert a post body to plain text, keeping code blocks as fenced blocks
+    """
+    soup = BeautifulSoup(body, "html.parser")
+    for pre in soup.find_all("pre"):
+        pre.replace_with(f"\n\n```\n{pre.get_text().rstrip()}\n```\n\n")
+    return BLANK_LINES_PATTERN.sub("\n\n", soup.get_text()).strip()
+
+
+def content_hash(text: str) -> str:
+    """
+    Hash of a post body; whitespace-only edits do not change it
+    """
+    normalized = WHITESPACE_PATTERN.sub(" ", text).strip()
+    return hashlib.sha256(normalized.encode()).hexdigest()[:32]
+
+
+class ThreadPost:
+    def __init__(self, post_id: str, kind: str, body: str, score: int = 0, accepted: bool = False):
+        self.post_id = post_id
+        self.kind = kind
+        self.body = body
+        self.score = score
+        self.accepted = accepted
+        self.hash = content_hash(body)
+
+    @property
+    def details(self) -> str:
+        return f"accepted, score {self.score}" if self.accepted else f"score {self.score}"
+
+    def label(self, number: Optional[int] = None) -> str:
+        if self.kind == "question":
+            return "Question"
+        return f"Answer {number} ({self.details})" if number else f"Answer ({self.details})"
+
+
+def render_thread(posts: List[ThreadPost]) -> str:
+    """
+    Format a thread the way summarization prompts and the retrieval chunker expect
+    """
+    parts = []
+    number = 0
+    for post in posts:
+        if post.kind == "answer":
+            number += 1
+        parts.append(f"{post.label(number)}: {post.body}")
+    return "\n\n".join(parts)
+
+
+class StackExchangeService:
+    """
+    Structured extraction of StackOverflow threads through the StackExchange API.
+
+    Unlike the LLM extraction, every post comes back separately with its ID,
+    score, accepted flag and a content hash, which is what change detection
+    on refresh is based on. ``posts`` holds every fetched answer (up to 100),
+    so votes moving an answer up or down never look like a change;
+    STACKEXCHANGE_MAX_ANSWERS only limits how many of the top-voted answers
+    go into ``content`` (the accepted answer is always included).
+    STACKEXCHANGE_KEY raises the anonymous request quota.
+    """
+
+    def __init__(self):
+        self.key = os.getenv("STACKEXCHANGE_KEY")
+        self.site = os.getenv("STACKEXCHANGE_SITE", "stackoverflow")
+        self.max_answers = int(os.getenv("STACKEXCHANGE_MAX_ANSWERS", "10"))
+        self.timeout = float(os.getenv("STACKEXCHANGE_TIMEOUT", "10"))
+
+    async def extract_stackoverflow_content(self, question_id: str) -> Dict[str, Any]:
+        """
+        Fetch a question and its answers
+        """
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                questions = await self._get(client, f"/questions/{question_id}")
+                if not questions:
+                    return {
+                        "success": False,
+                        "error": f"Question {question_id} not found"
+                    }
+
+                answers = await self._get(
+                    client,
+                    f"/questions/{question_id}/answers",
+                    sort="votes",
+                    order="desc",
+                    pagesize=100
+                )
+
+            question = questions[0]
+            posts = [ThreadPost(str(question["question_id"]), "question", html_to_text(question.get("body", "")))]
+            posts.extend(self._rank_answers(answers))
+
+            return {
+                "success": True,
+                "title": html.unescape(question.get("title", "")),
+                "content": render_thread(posts[:self.max_answers + 1]),
+                "tags": question.get("tags", []),
+                "posts": posts
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Error fetching StackOverflow thread: {str(e)}"
+            }
+
+    def _rank_answers(self, answers: List[Dict[str, Any]]) -> List[ThreadPost]:
+        """
+        All answers by votes, with the accepted answer first
+        """
+        posts = [
+            ThreadPost(
+                str(answer["answer_id"]),
+                "answer",
+                html_to_text(answer.get("body", "")),
+                score=answer.get("score", 0),
+                accepted=answer.get("is_accepted", False)
+            )
+            for answer in answers
+        ]
+        posts.sort(key=lambda post: (not post.accepted, -post.score))
+        return posts
+
+    async def _get(self, client: httpx.AsyncClient, path: str, **params) -> List[Dict[str, Any]]:
+        params.update(site=self.site, filter="withbody")
+        if self.key:
+            params["key"] = self.key
+
+        response = await client.get(f"{API_URL}{path}", params=params)
+        response.raise_for_status()
+        data = response.json()
+
+        if data.get("quota_remaining", 1) < 10:
+            logger.warning(f"StackExchange API quota almost exhausted: {data.get('quota_remaining')} requests left")
+        return data.get("items", [])
@@ -0,0 +1,192 @@
+import io
+import base64
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Tuple
+
+from .summary_store import BodyRow
+from ..utils.serialization import dumps, loads
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - columnar exports are optional
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+ARROW_BATCH_SIZE = 1000
+# NDJSON lines are sent in chunks of about this size instead of one per record
+NDJSON_CHUNK_BYTES = 64 * 1024
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(updated_at: float, question_id: str) -> str:
+    """
+    Opaque cursor for the keyset position of a summary
+    """
+    return base64.urlsafe_b64encode(f"{updated_at!r}:{question_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """
+    Decode a cursor produced by encode_cursor
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        updated_at, question_id = base64.urlsafe_b64decode(padded).decode().split(":", 1)
+        return float(updated_at), question_id
+    except ValueError as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def columnar_formats_available() -> bool:
+    return pa is not None
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def iter_ndjson(rows: Iterator[BodyRow]) -> Iterator[bytes]:
+    """
+    One JSON object per summary; the stored body is embedded without re-encoding
+    """
+    buffer: List[bytes] = []
+    size = 0
+    for question_id, body, created_at, updated_at in rows:
+        line = b"".join([
+            b'{"question_id":', dumps(question_id),
+            b',"created_at":', dumps(_isoformat(created_at)),
+            b',"updated_at":', dumps(_isoformat(updated_at)),
+            b',"cursor":', dumps(encode_cursor(updated_at, question_id)),
+            b',"summary":', body,
+            b"}\n",
+        ])
+        buffer.append(line)
+        size += len(line)
+        if size >= NDJSON_CHUNK_BYTES:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+
+    if buffer:
+        yield b"".join(buffer)
+
+
+def _arrow_schema():
+    strings = pa.list_(pa.string())
+    return pa.schema([
+        ("question_id", pa.string()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+        ("updated_at", pa.timestamp("us", tz="UTC")),
+        ("cursor", pa.string()),
+        ("title", pa.string()),
+        ("summary", pa.string()),
+        ("key_points", strings),
+        ("code_samples", strings),
+        ("tags", strings),
+        ("source_url", pa.string()),
+    ])
+
+
+def _record_batches(rows: Iterator[BodyRow]) -> Iterator["pa.RecordBatch"]:
+    schema = _arrow_schema()
+    batch: List[dict] = []
+    for question_id, body, created_at, updated_at in rows:
+        data = loads(body)
+        batch.append({
+            "question_id": question_id,
+            "created_at": datetime.fromtimestamp(created_at, timezone.utc),
+            "updated_at": datetime.fromtimestamp(updated_at, timezone.utc),
+            "cursor": encode_cursor(updated_at, question_id),
+            "title": data.get("title"),
+            "summary": data.get("summary"),
+            "key_points": data.get("key_points", []),
+            "code_samples": data.get("code_samples", []),
+            "tags": data.get("tags", []),
+            "source_url": data.get("source_url"),
+        })
+        if len(batch) >= ARROW_BATCH_SIZE:
+            yield pa.RecordBatch.from_pylist(batch, schema=schema)
+            batch = []
+
+    if batch:
+        yield pa.RecordBatch.from_pylist(batch, schema=schema)
+
+
+class _DrainableSink(io.RawIOBase):
+    """
+    Write-only file object whose buffered bytes are handed out as they arrive
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_arrow(rows: Iterator[BodyRow]) -> Iterator[bytes]:
+    """
+    Arrow IPC stream, one record batch per ARROW_BATCH_SIZE summaries
+    """
+    sink = _DrainableSink()
+    with pa.ipc.new_stream(sink, _arrow_schema()) as writer:
+        for batch in _record_batches(rows):
+            writer.write_batch(batch)
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def iter_parquet(rows: Iterator[BodyRow]) -> Iterator[bytes]:
+    """
+    Parquet file written one row group per ARROW_BATCH_SIZE summaries
+    """
+    sink = _DrainableSink()
+    with pq.ParquetWriter(sink, _arrow_schema()) as writer:
+        for batch in _record_batches(rows):
+            writer.write_batch(batch)
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def iter_export(rows: Iterator[BodyRow], export_format: str) -> Iterator[bytes]:
+    if export_format == "arrow":
+        return iter_arrow(rows)
+    if export_format == "parquet":
+        return iter_parquet(rows)
+    return iter_ndjson(rows)
+
+
+def to_timestamp(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
@@ -0,0 +1,123 @@
+from typing import List
+
+from ..models import SummaryData
+from ..prompts import SUMMARIZATION_PROMPT, SUMMARY_UPDATE_PROMPT, format_summary, format_tags
+from .retrieval import estimate_tokens
+from .stackexchange_service import ThreadPost
+from .summary_store import PostHashes
+
+UNCHANGED = "unchanged"
+INCREMENTAL = "incremental"
+FULL = "full"
+
+
+def post_hashes(posts: List[ThreadPost]) -> PostHashes:
+    return {post.post_id: (post.hash, post.accepted) for post in posts}
+
+
+class ThreadChanges:
+    """
+    Differences between the posts a summary was generated from and the current thread
+    """
+
+    def __init__(self, previous: PostHashes, posts: List[ThreadPost]):
+        self.posts = posts
+        self.added: List[ThreadPost] = []
+        self.edited: List[ThreadPost] = []
+        self.accepted_changed: List[ThreadPost] = []
+        self.question_changed = False
+
+        for post in posts:
+            recorded = previous.get(post.post_id)
+            if recorded is None:
+                self.added.append(post)
+            elif recorded[0] != post.hash:
+                if post.kind == "question":
+                    self.question_changed = True
+                else:
+                    self.edited.append(post)
+            elif recorded[1] != post.accepted:
+                self.accepted_changed.append(post)
+
+        current = {post.post_id for post in posts}
+        self.removed = [post_id for post_id in previous if post_id not in current]
+
+    @property
+    def changed_posts(self) -> List[ThreadPost]:
+        return self.added + self.edited + self.accepted_changed
+
+    @property
+    def unchanged(self) -> bool:
+        return not (self.changed_posts or self.removed or self.question_changed)
+
+    def changed_fraction(self) -> float:
+        """
+        Share of the thread's text that is in changed posts
+        """
+        total = sum(len(post.body) for post in self.posts)
+        changed = sum(len(post.body) for post in self.changed_posts)
+        return changed / total if total else 1.0
+
+    def render(self) -> str:
+        """
+        Describe the changed posts for the summary update prompt
+        """
+        parts = []
+        for heading, posts in [
+            ("New answer", self.added),
+            ("Edited answer", self.edited),
+        ]:
+            for post in posts:
+                parts.append(f"{heading} ({post.details}):\n{post.body}")
+
+        for post in self.accepted_changed:
+            status = "Answer is now accepted" if post.accepted else "Answer is no longer accepted"
+            parts.append(f"{status} (score {post.score}):\n{post.body}")
+
+        return "\n\n".join(parts)
+
+
+def plan_refresh(changes: ThreadChanges, has_hashes: bool, max_delta_fraction: float) -> str:
+    """
+    Choose how to bring a summary up to date.
+
+    Without recorded hashes, after a question edit or when answers were
+    deleted from the thread (the summary cannot tell which points came from
+    them; answers that only moved in the vote ranking are not removed), and when
+    most of the thread changed, only a full re-summarization is reliable.
+    """
+    if not has_hashes:
+        return FULL
+    if changes.unchanged:
+        return UNCHANGED
+    if changes.question_changed or changes.removed or changes.changed_fraction() > max_delta_fraction:
+        return FULL
+    return INCREMENTAL
+
+
+# Both estimates count characters the same way (estimate_tokens), so their
+# difference is comparable; provider-reported usage is not mixed in.
+
+def estimate_full_tokens(title: str, content: str, tags: List[str], summary: SummaryData) -> int:
+    """
+    Estimated input plus output tokens of re-summarizing the whole thread
+    """
+    prompt = SUMMARIZATION_PROMPT.prefix + SUMMARIZATION_PROMPT.render_suffix(
+        title=title,
+        tags=format_tags(tags),
+        content=content
+    )
+    return estimate_tokens(prompt) + estimate_tokens(format_summary(summary))
+
+
+def estimate_update_tokens(current: SummaryData, changes: ThreadChanges, updated: SummaryData) -> int:
+    """
+    Estimated input plus output tokens of merging the changes into the current summary
+    """
+    prompt = SUMMARY_UPDATE_PROMPT.prefix + SUMMARY_UPDATE_PROMPT.render_suffix(
+        title=current.title,
+        tags=format_tags(current.tags),
+        summary=format_summary(current),
+        changes=changes.render()
+    )
+    return estimate_tokens(prompt) + estimate_tokens(format_summary(updated))
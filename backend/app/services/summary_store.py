@@ -0,0 +1,264 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+from ..models import SummaryData
+from ..utils.serialization import dumps, loads, compress_variants
+
+
+class StoredSummary:
+    def __init__(
+        self,
+        question_id: str,
+        body: bytes,
+        body_gzip: bytes,
+        body_br: Optional[bytes],
+        etag: str,
+        created_at: float,
+        updated_at: float
+    ):
+        self.question_id = question_id
+        self.body = body
+        self.body_gzip = body_gzip
+        self.body_br = body_br
+        self.etag = etag
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @property
+    def summary(self) -> SummaryData:
+        return SummaryData(**loads(self.body))
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        """
+        Return the pre-serialized body for a content encoding
+        """
+        if encoding == "br" and self.body_br is not None:
+            return self.body_br
+        if encoding == "gzip":
+            return self.body_gzip
+        return self.body
+
+
+def body_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def summary_etag(summary: SummaryData) -> str:
+    """
+    ETag a summary gets when stored, as served by the summary endpoint
+    """
+    return body_etag(dumps(summary.model_dump()))
+
+
+# (question_id, body, created_at, updated_at) as streamed by SummaryStore.iter_bodies
+BodyRow = Tuple[str, bytes, float, float]
+
+# post_id -> (content hash, accepted) of the posts a summary was generated from
+PostHashes = Dict[str, Tuple[str, bool]]
+
+
+class SummaryStore:
+    """
+    SQLite-backed store of generated summaries, keyed by StackOverflow question ID.
+
+    Each summary is serialized and compressed once when it is saved, so reads
+    serve stored bytes without re-encoding.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("SUMMARY_DB_PATH", "summaries.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summaries (
+                question_id TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                body_gzip BLOB NOT NULL,
+                body_br BLOB,
+                etag TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        has_tags = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'summary_tags'"
+        ).fetchone()
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summary_tags (
+                question_id TEXT NOT NULL,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (tag, question_id)
+            )
+            """
+        )
+        if not has_tags:
+            # Backfill tags of summaries stored before the tag table existed
+            self._conn.execute(
+                "INSERT OR IGNORE INTO summary_tags (question_id, tag) "
+                "SELECT s.question_id, lower(t.value) FROM summaries s, "
+                "json_each(CAST(s.body AS TEXT), '$.tags') t"
+            )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summary_posts (
+                question_id TEXT NOT NULL,
+                post_id TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                accepted INTEGER NOT NULL,
+                PRIMARY KEY (question_id, post_id)
+            )
+            """
+        )
+        # Keyset pagination for exports walks summaries in (updated_at, question_id) order
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_summaries_updated ON summaries (updated_at, question_id)"
+        )
+        self._conn.commit()
+        self._last_updated_at = self._conn.execute("SELECT MAX(updated_at) FROM summaries").fetchone()[0] or 0.0
+
+    def get(self, question_id: str) -> Optional[StoredSummary]:
+        """
+        Load a stored summary
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT question_id, body, body_gzip, body_br, etag, created_at, updated_at "
+                "FROM summaries WHERE question_id = ?",
+                (question_id,)
+            ).fetchone()
+
+        return StoredSummary(*row) if row else None
+
+    def save(self, question_id: str, summary: SummaryData) -> StoredSummary:
+        """
+        Serialize, compress and store a summary
+        """
+        body = dumps(summary.model_dump())
+        variants = compress_variants(body)
+        etag = body_etag(body)
+
+        with self._lock:
+            existing = self._conn.execute(
+                "SELECT created_at, etag FROM summaries WHERE question_id = ?",
+                (question_id,)
+            ).fetchone()
+            unchanged = existing is not None and existing[1] == etag
+
+            # Unchanged content keeps its timestamps so caches stay valid
+            if not unchanged:
+                # Read the clock under the lock and never step back, so saves get strictly
+                # increasing updated_at values in commit order and export cursors miss none
+                now = max(time.time(), self._last_updated_at + 1e-6)
+                self._last_updated_at = now
+                created_at = existing[0] if existing else now
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO summaries "
+                    "(question_id, body, body_gzip, body_br, etag, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (question_id, body, variants["gzip"], variants["br"], etag, created_at, now)
+                )
+                self._conn.execute("DELETE FROM summary_tags WHERE question_id = ?", (question_id,))
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO summary_tags (question_id, tag) VALUES (?, ?)",
+                    [(question_id, tag.lower()) for tag in summary.tags]
+                )
+                self._conn.commit()
+
+        if unchanged:
+            return self.get(question_id)
+
+        return StoredSummary(question_id, body, variants["gzip"], variants["br"], etag, created_at, now)
+
+    def get_post_hashes(self, question_id: str) -> PostHashes:
+        """
+        Load the post hashes recorded for a summary (empty if none were recorded)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT post_id, hash, accepted FROM summary_posts WHERE question_id = ?",
+                (question_id,)
+            ).fetchall()
+
+        return {post_id: (post_hash, bool(accepted)) for post_id, post_hash, accepted in rows}
+
+    def save_post_hashes(self, question_id: str, hashes: PostHashes) -> None:
+        """
+        Replace the post hashes of a summary
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM summary_posts WHERE question_id = ?", (question_id,))
+            self._conn.executemany(
+                "INSERT INTO summary_posts (question_id, post_id, hash, accepted) VALUES (?, ?, ?, ?)",
+                [(question_id, post_id, post_hash, int(accepted)) for post_id, (post_hash, accepted) in hashes.items()]
+            )
+            self._conn.commit()
+
+    def iter_bodies(
+        self,
+        after: Optional[Tuple[float, str]] = None,
+        tag: Optional[str] = None,
+        created_from: Optional[float] = None,
+        created_to: Optional[float] = None,
+        changed_since: Optional[float] = None,
+        limit: Optional[int] = None,
+        page_size: int = 500
+    ) -> Iterator[BodyRow]:
+        """
+        Stream stored summaries in (updated_at, question_id) order.
+
+        Rows are read page by page with a keyset condition, so memory use does
+        not grow with the size of the store. ``after`` is the (updated_at,
+        question_id) position of the last row already seen.
+        """
+        conditions = []
+        params: list = []
+        if tag:
+            conditions.append("EXISTS (SELECT 1 FROM summary_tags t WHERE t.tag = ? AND t.question_id = s.question_id)")
+            params.append(tag.lower())
+        if created_from is not None:
+            conditions.append("s.created_at >= ?")
+            params.append(created_from)
+        if created_to is not None:
+            conditions.append("s.created_at < ?")
+            params.append(created_to)
+        if changed_since is not None:
+            conditions.append("s.updated_at > ?")
+            params.append(changed_since)
+
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_conditions = list(conditions)
+            page_params = list(params)
+            if after is not None:
+                page_conditions.append("(s.updated_at > ? OR (s.updated_at = ? AND s.question_id > ?))")
+                page_params.extend([after[0], after[0], after[1]])
+
+            where = f"WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+            size = page_size if remaining is None else min(page_size, remaining)
+
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT s.question_id, s.body, s.created_at, s.updated_at FROM summaries s {where} "
+                    "ORDER BY s.updated_at, s.question_id LIMIT ?",
+                    page_params + [size]
+                ).fetchall()
+
+            yield from rows
+            if len(rows) < size:
+                return
+
+            after = (rows[-1][3], rows[-1][0])
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,186 @@
+import os
+import hmac
+import asyncio
+import random
+import time
+import uuid
+import logging
+from typing import Optional
+from urllib.parse import parse_qs
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import HTMLRenderer, SpeedscopeRenderer
+except ImportError:  # pragma: no cover - profiling is optional
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+# Opt-in flag only; the token itself is never accepted in the URL, where access logs would record it
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_QUERY_VALUES = ("1", "true")
+PROFILE_ID_HEADER = b"x-profile-id"
+# Profile downloads carry the token for auth; they are never profiled themselves
+EXCLUDED_PATH_PREFIXES = ("/api/profiles/",)
+
+
+class ProfilingSettings:
+    def __init__(self):
+        # Shared secret that authorizes on-demand profiling of a single request
+        self.token = os.getenv("PROFILING_TOKEN")
+        # Fraction of requests profiled continuously (0.0 disables it)
+        self.sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+        # Sampling interval in seconds; pyinstrument defaults to 1ms
+        self.interval = float(os.getenv("PROFILE_INTERVAL", "0.001"))
+        self.output_dir = os.getenv("PROFILE_DIR", "profiles")
+        # "speedscope" (JSON, open at https://www.speedscope.app) or "html"
+        self.output_format = os.getenv("PROFILE_FORMAT", "speedscope").lower()
+        # Retention, enforced on every save: oldest profiles beyond the count or age are deleted
+        self.max_files = int(os.getenv("PROFILE_MAX_FILES", "500"))
+        self.max_age = float(os.getenv("PROFILE_MAX_AGE", str(7 * 24 * 3600)))
+
+    @property
+    def available(self) -> bool:
+        return Profiler is not None
+
+    @property
+    def extension(self) -> str:
+        return "html" if self.output_format == "html" else "speedscope.json"
+
+
+def token_matches(provided: Optional[str], expected: Optional[str]) -> bool:
+    """
+    Constant-time token comparison that accepts any header value
+    """
+    # compare_digest raises TypeError for non-ASCII str, so compare bytes
+    if not provided or not expected:
+        return False
+    return hmac.compare_digest(provided.encode("utf-8"), expected.encode("utf-8"))
+
+
+def profile_path(settings: ProfilingSettings, profile_id: str) -> Optional[str]:
+    """
+    Resolve the stored profile file for a profile ID, if it exists
+    """
+    # Profile IDs are hex UUIDs; reject anything else to avoid path traversal
+    if not profile_id or not all(c in "0123456789abcdef" for c in profile_id):
+        return None
+
+    path = os.path.join(settings.output_dir, f"{profile_id}.{settings.extension}")
+    return path if os.path.isfile(path) else None
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that runs selected requests under pyinstrument.
+
+    A request is profiled when it carries the PROFILING_TOKEN in the
+    ``X-Profile`` header (``?profile=1`` may mark it as well, but never
+    replaces the header), or when it is picked by the global
+    PROFILE_SAMPLE_RATE. Pyinstrument's async mode
+    attributes time spent awaiting (e.g. the provider SDK calls) to the
+    coroutine that awaited it. The profile is written to PROFILE_DIR and its
+    ID is returned in the ``X-Profile-ID`` response header. Profile downloads
+    are excluded, so fetching a profile does not write a new one.
+    """
+
+    def __init__(self, app, settings: Optional[ProfilingSettings] = None):
+        self.app = app
+        self.settings = settings or ProfilingSettings()
+
+        if not self.settings.available and (self.settings.token or self.settings.sample_rate > 0):
+            logger.warning("Profiling is configured but pyinstrument is not installed")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER, profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = Profiler(interval=self.settings.interval, async_mode="enabled")
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            # Rendering is CPU-bound; keep it off the event loop
+            await asyncio.to_thread(self._save, profiler, profile_id)
+            logger.info(
+                f"Profiled {scope['method']} {scope['path']} in {elapsed_ms:.1f}ms "
+                f"(profile {profile_id})"
+            )
+
+    def _should_profile(self, scope) -> bool:
+        """
+        Decide whether this request is profiled
+        """
+        if not self.settings.available or scope["path"].startswith(EXCLUDED_PATH_PREFIXES):
+            return False
+
+        if token_matches(self._request_token(scope), self.settings.token) and self._flag_allows(scope):
+            return True
+
+        return self.settings.sample_rate > 0 and random.random() < self.settings.sample_rate
+
+    def _request_token(self, scope) -> Optional[str]:
+        """
+        Read the profiling token from the request header
+        """
+        for name, value in scope.get("headers", []):
+            if name.decode("latin-1").lower() == PROFILE_HEADER:
+                return value.decode("latin-1")
+        return None
+
+    def _flag_allows(self, scope) -> bool:
+        """
+        A ``profile`` query parameter, if present, must be an opt-in flag
+        """
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        values = query.get(PROFILE_QUERY_PARAM)
+        return not values or values[0].lower() in PROFILE_QUERY_VALUES
+
+    def _save(self, profiler, profile_id: str) -> None:
+        """
+        Render the profile and write it to the profile directory
+        """
+        try:
+            os.makedirs(self.settings.output_dir, exist_ok=True)
+            renderer = HTMLRenderer() if self.settings.output_format == "html" else SpeedscopeRenderer()
+            path = os.path.join(self.settings.output_dir, f"{profile_id}.{self.settings.extension}")
+
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(profiler.output(renderer))
+
+            self._enforce_retention()
+        except Exception as e:
+            logger.error(f"Failed to save profile {profile_id}: {str(e)}")
+
+    def _enforce_retention(self) -> None:
+        """
+        Delete profiles older than PROFILE_MAX_AGE, then the oldest beyond PROFILE_MAX_FILES
+        """
+        suffix = f".{self.settings.extension}"
+        profiles = []
+        for entry in os.scandir(self.settings.output_dir):
+            if entry.is_file() and entry.name.endswith(suffix):
+                profiles.append((entry.stat().st_mtime, entry.path))
+        profiles.sort(reverse=True)
+
+        cutoff = time.time() - self.settings.max_age
+        for position, (modified, path) in enumerate(profiles):
+            if position >= self.settings.max_files or modified < cutoff:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
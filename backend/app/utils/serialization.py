@@ -0,0 +1,95 @@
+import gzip
+import json
+from typing import Any, Dict, Optional
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli responses are optional
+    brotli = None
+
+# orjson is several times faster than the stdlib encoder for pydantic dumps
+JSONResponseClass = ORJSONResponse if orjson is not None else JSONResponse
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def dumps(data: Any) -> bytes:
+    """
+    Serialize data to compact JSON bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    """
+    Parse JSON bytes or text
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def compress_variants(body: bytes) -> Dict[str, Optional[bytes]]:
+    """
+    Pre-compress a response body for every supported content encoding
+    """
+    return {
+        "gzip": gzip.compress(body, compresslevel=GZIP_LEVEL),
+        "br": brotli.compress(body, quality=BROTLI_QUALITY) if brotli is not None else None,
+    }
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available: Dict[str, Optional[bytes]]) -> Optional[str]:
+    """
+    Pick the best available content encoding for an Accept-Encoding header
+    """
+    if not accept_encoding:
+        return None
+
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    # Prefer brotli (smaller) over gzip when both are accepted
+    for coding in ("br", "gzip"):
+        quality = accepted.get(coding, accepted.get("*", 0.0))
+        if quality > 0 and available.get(coding) is not None:
+            return coding
+    return None
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check an If-None-Match header against a strong ETag.
+
+    Encoding-specific variants ("<hash>-gzip") and weak forms of the same
+    ETag match too, as If-None-Match uses weak comparison.
+    """
+    base = etag.strip('"')
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"').split("-")[0] == base:
+            return True
+    return False
@@ -0,0 +1,34 @@
+import logging
+from contextvars import ContextVar
+from typing import List, Optional
+
+from ..models import TokenUsage
+
+logger = logging.getLogger(__name__)
+
+# Token usage of the provider calls made while handling the current request
+_request_usage: ContextVar[Optional[List[TokenUsage]]] = ContextVar("request_usage", default=None)
+
+
+def start_usage_tracking() -> List[TokenUsage]:
+    """
+    Start collecting token usage for the current request
+    """
+    usage: List[TokenUsage] = []
+    _request_usage.set(usage)
+    return usage
+
+
+def record_usage(usage: TokenUsage) -> None:
+    """
+    Log the token usage of a provider call and attach it to the current request
+    """
+    logger.info(
+        f"{usage.provider} {usage.model} [{usage.prompt}] input={usage.input_tokens} "
+        f"cached={usage.cached_input_tokens} uncached={usage.uncached_input_tokens} "
+        f"cache_write={usage.cache_write_tokens} output={usage.output_tokens}"
+    )
+
+    collected = _request_usage.get()
+    if collected is not None:
+        collected.append(usage)
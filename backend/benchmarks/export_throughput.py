@@ -0,0 +1,109 @@
+"""
+Benchmark GET /api/summaries/export: records and bytes per second for each
+format, and peak Python heap while streaming, for stores of different sizes.
+
+Summaries are synthetic and written straight into a temporary store. The
+export is driven through the ASGI app with a receiver that only counts bytes
+(httpx's ASGI transport buffers whole responses, which would hide the
+streaming behaviour).
+
+    cd backend
+    python -m benchmarks.export_throughput --sizes 10000 50000
+"""
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+# Importing app.main opens the default store; keep it out of the working directory
+os.environ.setdefault("SUMMARY_DB_PATH", os.path.join(tempfile.mkdtemp(), "summaries.db"))
+
+from app.models import SummaryData
+from app.services.summary_store import SummaryStore
+from app.services.summary_export import columnar_formats_available
+
+
+def populate(store: SummaryStore, count: int) -> None:
+    for i in range(count):
+        store.save(str(i), SummaryData(
+            title=f"How do I do thing number {i}?",
+            summary="A clear, concise summary of the main problem and solution. " * 3,
+            key_points=[f"Key point {n} about the solution" for n in range(4)],
+            code_samples=["for item in items:\n    process(item)"],
+            tags=["python", f"topic-{i % 50}"],
+            source_url=f"https://stackoverflow.com/questions/{i}"
+        ))
+
+
+async def export(app, export_format: str) -> int:
+    received = 0
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/summaries/export",
+        "raw_path": b"/api/summaries/export",
+        "query_string": f"format={export_format}".encode(),
+        "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+    }
+
+    request_sent = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # StreamingResponse listens for a disconnect until the body is sent
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal received
+        if message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return received
+
+
+def main(args) -> None:
+    from app import main as api
+
+    formats = ["ndjson"] + (["arrow", "parquet"] if columnar_formats_available() else [])
+    print(f"{'records':>8} | {'format':>7} | {'seconds':>7} | {'records/s':>10} | {'MB/s':>6} | {'peak heap':>9}")
+
+    for size in args.sizes:
+        api.summary_store = SummaryStore(os.path.join(tempfile.mkdtemp(), "export.db"))
+        populate(api.summary_store, size)
+
+        for export_format in formats:
+            started = time.perf_counter()
+            received = asyncio.run(export(api.app, export_format))
+            elapsed = time.perf_counter() - started
+
+            # Separate pass: tracemalloc slows the export down considerably
+            tracemalloc.start()
+            asyncio.run(export(api.app, export_format))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print(
+                f"{size:>8} | {export_format:>7} | {elapsed:>7.2f} | {size / elapsed:>10.0f} | "
+                f"{received / elapsed / 1e6:>6.1f} | {peak / 1e6:>7.1f}MB"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    main(parser.parse_args())
@@ -0,0 +1,102 @@
+"""
+Measure how much speculative prefetching cuts the latency a user perceives
+between pressing submit and seeing the summary.
+
+Provider calls are replaced by fakes that sleep for a typical extraction and
+summarization time, so the benchmark runs offline and is repeatable. Each
+scenario pastes a URL, waits for the user's "think time" and then submits,
+once without and once with a prefetch fired at paste time.
+
+    cd backend
+    python -m benchmarks.prefetch_latency --extract 4 --summarize 3 --scale 0.1
+"""
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+os.environ.setdefault("SUMMARY_DB_PATH", os.path.join(tempfile.mkdtemp(), "summaries.db"))
+
+import httpx
+
+from app import main
+from app.models import SummaryData
+
+
+class FakeStackExchangeService:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def extract_stackoverflow_content(self, question_id: str):
+        await asyncio.sleep(self.delay)
+        return {"success": True, "title": "Question", "content": "content", "tags": [], "posts": []}
+
+
+class FakeAnthropicService:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def extract_stackoverflow_content(self, url: str):
+        await asyncio.sleep(self.delay)
+        return {"success": True, "title": "Question", "content": "content", "tags": [], "source_url": url}
+
+
+class FakeOpenAIService:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def summarize_content(self, title, content, tags=None):
+        await asyncio.sleep(self.delay)
+        return SummaryData(title=title, summary="summary", key_points=[], code_samples=[], tags=[])
+
+
+async def submit_latency(client: httpx.AsyncClient, question_id: int, think_time: float, prefetch: bool) -> float:
+    url = f"https://stackoverflow.com/questions/{question_id}/benchmark"
+
+    if prefetch:
+        await client.post("/api/prefetch", json={"url": url})
+    await asyncio.sleep(think_time)
+
+    started = time.perf_counter()
+    response = await client.post("/api/summarize", json={"url": url})
+    assert response.json()["success"], response.text
+    return time.perf_counter() - started
+
+
+async def run(args) -> None:
+    # Extraction goes through the StackExchange API first; the Anthropic fake is only the fallback
+    main.stackexchange_service = FakeStackExchangeService(args.extract * args.scale)
+    main.anthropic_service = FakeAnthropicService(args.extract * args.scale)
+    main.openai_service = FakeOpenAIService(args.summarize * args.scale)
+
+    question_id = 1000
+    print(f"pipeline: {args.extract + args.summarize:.1f}s, {args.runs} runs per scenario (scaled by {args.scale})")
+    print(f"{'think time':>10} | {'no prefetch':>12} | {'prefetch':>12} | {'reduction':>9}")
+
+    async with httpx.AsyncClient(app=main.app, base_url="http://benchmark", timeout=None) as client:
+        for think_time in args.think_times:
+            results = {}
+            for prefetch in (False, True):
+                samples = []
+                for _ in range(args.runs):
+                    question_id += 1
+                    samples.append(await submit_latency(client, question_id, think_time * args.scale, prefetch))
+                # Report in unscaled seconds
+                results[prefetch] = statistics.median(samples) / args.scale
+
+            reduction = 1 - results[True] / results[False]
+            print(f"{think_time:>9.1f}s | {results[False]:>11.2f}s | {results[True]:>11.2f}s | {reduction:>8.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--extract", type=float, default=4.0, help="extraction time in seconds")
+    parser.add_argument("--summarize", type=float, default=3.0, help="summarization time in seconds")
+    parser.add_argument("--think-times", type=float, nargs="+", default=[0.0, 1.0, 3.0, 5.0, 10.0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=0.1, help="multiply all delays to speed up the run")
+    asyncio.run(run(parser.parse_args()))
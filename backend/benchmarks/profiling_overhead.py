@@ -0,0 +1,97 @@
+"""
+Measure the per-request cost of profiling a request with ProfilingMiddleware,
+including rendering and writing the profile file.
+
+A synthetic endpoint awaits a fixed delay (standing in for the provider call)
+and then spends a few milliseconds encoding and decoding JSON, so the result
+does not depend on network access. Requests are sent one at a time through
+the ASGI app, alternating between a profiled and an unprofiled app.
+
+    cd backend
+    python -m benchmarks.profiling_overhead --requests 200 --intervals 0.01 0.001
+"""
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+from typing import Dict, List
+
+import httpx
+import pyinstrument
+from fastapi import FastAPI
+
+from app.utils.profiling import ProfilingMiddleware, ProfilingSettings
+
+PAYLOAD = {"items": [{"id": i, "text": "x" * 40, "tags": ["a", "b", "c"]} for i in range(800)]}
+
+
+def build_app(await_seconds: float, interval: float, profile: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        await asyncio.sleep(await_seconds)
+        for _ in range(3):
+            json.loads(json.dumps(PAYLOAD))
+        return {"ok": True}
+
+    settings = ProfilingSettings()
+    settings.token = None
+    settings.sample_rate = 1.0 if profile else 0.0
+    settings.interval = interval
+    settings.output_dir = tempfile.mkdtemp()
+    settings.output_format = "speedscope"
+    app.add_middleware(ProfilingMiddleware, settings=settings)
+    return app
+
+
+async def median_latencies(apps: Dict[str, FastAPI], requests: int) -> Dict[str, float]:
+    clients = {
+        name: httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
+        for name, app in apps.items()
+    }
+    samples: Dict[str, List[float]] = {name: [] for name in apps}
+    try:
+        # Warm up imports and the first profiler start
+        for client in clients.values():
+            for _ in range(5):
+                await client.get("/work")
+
+        # Interleave the configurations so machine noise affects them equally
+        for _ in range(requests):
+            for name, client in clients.items():
+                started = time.perf_counter()
+                response = await client.get("/work")
+                samples[name].append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.text
+    finally:
+        for client in clients.values():
+            await client.aclose()
+
+    return {name: statistics.median(values) for name, values in samples.items()}
+
+
+async def run(args) -> None:
+    print(f"pyinstrument {pyinstrument.__version__}, {args.requests} sequential requests per configuration, "
+          f"{args.await_ms:.0f}ms await per request")
+
+    apps = {"off": build_app(args.await_ms / 1000, 0.001, profile=False)}
+    for interval in args.intervals:
+        apps[f"{interval * 1000:g}ms"] = build_app(args.await_ms / 1000, interval, profile=True)
+
+    latencies = await median_latencies(apps, args.requests)
+    baseline = latencies["off"]
+    print(f"{'interval':>9} {'median':>9} {'overhead':>9}")
+    for name, latency in latencies.items():
+        overhead = "-" if name == "off" else f"{latency - baseline:.1f}ms"
+        print(f"{name:>9} {latency:>7.1f}ms {overhead:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--await-ms", type=float, default=20)
+    parser.add_argument("--intervals", type=float, nargs="+", default=[0.01, 0.001])
+    asyncio.run(run(parser.parse_args()))
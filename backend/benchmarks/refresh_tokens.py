@@ -0,0 +1,100 @@
+"""
+Estimate the tokens (input plus output) of refreshing a summary after a
+thread change: the summary update prompt (current summary plus changed
+posts) versus re-summarizing the whole thread.
+
+Threads are generated deterministically, and tokens are estimated with the
+same functions the refresh endpoint uses for estimated_tokens_saved, so no
+provider calls are made. The "votes reordered" scenario reverses the vote
+order of the answers without changing any post.
+
+    cd backend
+    python -m benchmarks.refresh_tokens --answers 5 10 20
+"""
+import random
+import argparse
+
+from app.models import SummaryData
+from app.services.stackexchange_service import ThreadPost, render_thread
+from app.services.summary_refresh import (
+    INCREMENTAL,
+    UNCHANGED,
+    ThreadChanges,
+    estimate_full_tokens,
+    estimate_update_tokens,
+    plan_refresh,
+    post_hashes
+)
+
+WORDS = (
+    "the this that with when you should use instead because works fine error raises returns "
+    "value list dict object function method class module import call loop event task result "
+    "version python library example option setting default behaviour performance faster slower"
+).split()
+
+
+def paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(" ".join(rng.sample(WORDS, 12)).capitalize() + "." for _ in range(sentences))
+
+
+def post_body(rng: random.Random) -> str:
+    body = paragraph(rng, rng.randint(3, 8))
+    if rng.random() < 0.7:
+        body += "\n\n```\n" + "\n".join(f"value = step_{i}(value)" for i in range(rng.randint(3, 10))) + "\n```"
+    return body + "\n\n" + paragraph(rng, rng.randint(2, 5))
+
+
+def build_posts(rng: random.Random, answers: int) -> list:
+    posts = [ThreadPost("q", "question", paragraph(rng, 8))]
+    for number in range(answers):
+        posts.append(ThreadPost(f"a{number}", "answer", post_body(rng), score=answers - number, accepted=number == 0))
+    return posts
+
+
+def main(args) -> None:
+    rng = random.Random(42)
+    summary = SummaryData(
+        title="How do I process results of many tasks?",
+        summary=paragraph(rng, 3),
+        key_points=[paragraph(rng, 1) for _ in range(4)],
+        code_samples=["\n".join(f"value = step_{i}(value)" for i in range(6))],
+        tags=["python", "asyncio"]
+    )
+
+    print(f"{'answers':>8} {'change':>16} {'mode':>12} {'full':>7} {'refresh':>7} {'saved':>7}")
+    for answers in args.answers:
+        posts = build_posts(rng, answers)
+        previous = post_hashes(posts)
+
+        new_answer = ThreadPost("new", "answer", post_body(rng), score=1)
+        edited = ThreadPost("a1", "answer", posts[2].body + "\n\nEdit: " + paragraph(rng, 2), score=posts[2].score)
+        accepted = ThreadPost("a2", "answer", posts[3].body, score=posts[3].score, accepted=True)
+        reordered = posts[:1] + [
+            ThreadPost(post.post_id, "answer", post.body, score=number, accepted=post.accepted)
+            for number, post in enumerate(posts[1:])
+        ]
+        scenarios = [
+            ("votes reordered", reordered),
+            ("new answer", posts + [new_answer]),
+            ("edited answer", posts[:2] + [edited] + posts[3:]),
+            ("accepted changed", posts[:3] + [accepted] + posts[4:]),
+        ]
+
+        for name, current in scenarios:
+            changes = ThreadChanges(previous, current)
+            mode = plan_refresh(changes, True, args.max_delta_fraction)
+            full = estimate_full_tokens(summary.title, render_thread(current), summary.tags, summary)
+            if mode == UNCHANGED:
+                refresh = 0
+            elif mode == INCREMENTAL:
+                refresh = estimate_update_tokens(summary, changes, summary)
+            else:
+                refresh = full
+            print(f"{answers:>8} {name:>16} {mode:>12} {full:>7} {refresh:>7} {1 - refresh / full:>7.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, nargs="+", default=[3, 5, 10, 20])
+    parser.add_argument("--max-delta-fraction", type=float, default=0.5)
+    main(parser.parse_args())
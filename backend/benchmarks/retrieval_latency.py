@@ -0,0 +1,103 @@
+"""
+Benchmark retrieval for follow-up chat: index build time, search latency and
+the input tokens sent with the top-k chunks versus the full thread.
+
+A synthetic thread (question plus N answers with prose and code blocks) is
+generated deterministically, so runs are comparable across machines.
+
+    cd backend
+    python -m benchmarks.retrieval_latency --answers 30 --queries 500
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+from app.services.retrieval import ContentIndex, estimate_tokens
+
+TOPICS = [
+    "asyncio", "threading", "multiprocessing", "generator", "decorator", "context manager",
+    "dataclass", "pydantic", "sqlalchemy", "fastapi", "dependency injection", "middleware",
+    "pagination", "caching", "serialization", "timezone", "unicode", "regex", "logging",
+    "packaging", "virtualenv", "pytest", "mocking", "profiling", "memory leak", "deadlock",
+]
+WORDS = (
+    "the this that with when you should use instead because works fine error raises returns "
+    "value list dict object function method class module import call loop event task result "
+    "version python library example option setting default behaviour performance faster slower"
+).split()
+
+
+def sentence(rng: random.Random, topic: str) -> str:
+    words = rng.sample(WORDS, 12)
+    words.insert(rng.randrange(len(words)), topic)
+    return " ".join(words).capitalize() + "."
+
+
+def code_block(rng: random.Random, topic: str) -> str:
+    name = topic.replace(" ", "_")
+    lines = [f"def use_{name}_{i}(value):" if i == 0 else f"    value = {name}_step_{i}(value)" for i in range(rng.randint(3, 10))]
+    return "```python\n" + "\n".join(lines) + "\n    return value\n```"
+
+
+def build_thread(rng: random.Random, answers: int) -> str:
+    parts = ["Question: " + " ".join(sentence(rng, rng.choice(TOPICS)) for _ in range(6))]
+    for number in range(1, answers + 1):
+        topic = TOPICS[number % len(TOPICS)]
+        parts.append(f"Answer {number}: " + " ".join(sentence(rng, topic) for _ in range(rng.randint(3, 8))))
+        if rng.random() < 0.7:
+            parts.append(code_block(rng, topic))
+        parts.append(" ".join(sentence(rng, topic) for _ in range(rng.randint(2, 5))))
+    return "\n\n".join(parts)
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main(args) -> None:
+    rng = random.Random(42)
+    content = build_thread(rng, args.answers)
+    index = ContentIndex(os.path.join(tempfile.mkdtemp(), "retrieval.db"))
+
+    started = time.perf_counter()
+    chunk_count = index.index("1", content)
+    index_ms = (time.perf_counter() - started) * 1000
+
+    queries = [f"how does {rng.choice(TOPICS)} {rng.choice(WORDS)} work" for _ in range(args.queries)]
+
+    # Cold: the BM25 index is rebuilt from SQLite
+    index._indexes.clear()
+    started = time.perf_counter()
+    index.search("1", queries[0], args.k)
+    cold_ms = (time.perf_counter() - started) * 1000
+
+    samples = []
+    retrieved_tokens = []
+    for query in queries:
+        started = time.perf_counter()
+        chunks = index.search("1", query, args.k)
+        samples.append((time.perf_counter() - started) * 1000)
+        retrieved_tokens.append(sum(estimate_tokens(chunk.render()) for chunk in chunks))
+
+    full_tokens = estimate_tokens(content)
+    average_tokens = statistics.mean(retrieved_tokens)
+    print(f"thread: {args.answers} answers, {len(content)} chars, {chunk_count} chunks, ~{full_tokens} tokens")
+    print(f"index build: {index_ms:.2f}ms, cold search: {cold_ms:.2f}ms")
+    print(
+        f"search (k={args.k}, {args.queries} queries): p50 {statistics.median(samples):.3f}ms, "
+        f"p95 {percentile(samples, 0.95):.3f}ms, max {max(samples):.3f}ms"
+    )
+    print(f"input tokens per turn: ~{average_tokens:.0f} retrieved vs ~{full_tokens} full thread "
+          f"({1 - average_tokens / full_tokens:.0%} fewer)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, default=30)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=4)
+    main(parser.parse_args())
@@ -12,9 +12,10 @@ interface Message {
 
 interface ChatInterfaceProps {
   initialContext: string
+  questionId?: string | null
 }
 
-export default function ChatInterface({ initialContext }: ChatInterfaceProps) {
+export default function ChatInterface({ initialContext, questionId }: ChatInterfaceProps) {
   const [messages, setMessages] = useState<Message[]>([
     {
       id: '1',
@@ -23,6 +24,9 @@ export default function ChatInterface({ initialContext }: ChatInterfaceProps) {
       timestamp: new Date()
     }
   ])
+  // The backend returns the conversation so far; sending it back unchanged keeps
+  // earlier turns a prefix of the next prompt, which the provider can cache
+  const [context, setContext] = useState(initialContext)
   const [inputMessage, setInputMessage] = useState('')
   const [isLoading, setIsLoading] = useState(false)
   const messagesEndRef = useRef<HTMLDivElement>(null)
@@ -35,6 +39,10 @@ export default function ChatInterface({ initialContext }: ChatInterfaceProps) {
     scrollToBottom()
   }, [messages])
 
+  useEffect(() => {
+    setContext(initialContext)
+  }, [initialContext])
+
   const sendMessage = async () => {
     if (!inputMessage.trim() || isLoading) return
 
@@ -59,13 +67,15 @@ export default function ChatInterface({ initialContext }: ChatInterfaceProps) {
         },
         body: JSON.stringify({
           message: inputMessage,
-          context: initialContext
+          context,
+          question_id: questionId || undefined
         }),
       })
 
       const data = await response.json()
 
       if (data.success) {
+        setContext(data.data.context)
         const aiMessage: Message = {
           id: (Date.now() + 1).toString(),
           content: data.data.message,
@@ -1,8 +1,21 @@
 'use client'
 
-import { useState } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { Link, MessageSquare, Send } from 'lucide-react'
 
+// Mirrors is_stackoverflow_url in the backend's url_parser
+const isStackOverflowQuestionUrl = (url: string) => {
+  try {
+    const urlObj = new URL(url)
+    return ['stackoverflow.com', 'www.stackoverflow.com'].includes(urlObj.hostname) &&
+           urlObj.pathname.includes('/questions/')
+  } catch {
+    return false
+  }
+}
+
+const PREFETCH_DELAY_MS = 300
+
 interface InputFormProps {
   onSubmit: (url: string, question: string) => void
   disabled?: boolean
@@ -13,6 +26,33 @@ export default function InputForm({ onSubmit, disabled = false }: InputFormProps
   const [question, setQuestion] = useState('')
   const [inputType, setInputType] = useState<'url' | 'question'>('url')
   const [errors, setErrors] = useState<{ url?: string; question?: string }>({})
+  const prefetchedUrl = useRef<string | null>(null)
+
+  // Start summarizing a pasted URL speculatively; the submit attaches to it
+  useEffect(() => {
+    const candidate = url.trim()
+    if (inputType !== 'url' || !isStackOverflowQuestionUrl(candidate) || prefetchedUrl.current === candidate) {
+      return
+    }
+
+    const timer = setTimeout(() => {
+      prefetchedUrl.current = candidate
+      const apiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
+
+      fetch(`${apiUrl}/api/prefetch`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ url: candidate }),
+        keepalive: true,
+      }).catch(() => {
+        // Prefetching is best-effort; the submit works without it
+      })
+    }, PREFETCH_DELAY_MS)
+
+    return () => clearTimeout(timer)
+  }, [url, inputType])
 
   const validateInput = () => {
     const newErrors: { url?: string; question?: string } = {}
@@ -20,7 +60,7 @@ export default function InputForm({ onSubmit, disabled = false }: InputFormProps
     if (inputType === 'url') {
       if (!url.trim()) {
         newErrors.url = 'Please enter a StackOverflow URL'
-      } else if (!isValidStackOverflowUrl(url)) {
+      } else if (!isStackOverflowQuestionUrl(url)) {
         newErrors.url = 'Please enter a valid StackOverflow question URL'
       }
     } else {
@@ -43,16 +83,6 @@ export default function InputForm({ onSubmit, disabled = false }: InputFormProps
     }
   }
 
-  const isValidStackOverflowUrl = (url: string) => {
-    try {
-      const urlObj = new URL(url)
-      return urlObj.hostname.includes('stackoverflow.com') && 
-             urlObj.pathname.includes('/questions/')
-    } catch {
-      return false
-    }
-  }
-
   const clearErrors = () => {
     setErrors({})
   }
@@ -0,0 +1,227 @@
+// Client-side data layer for summaries: an IndexedDB cache keyed by question
+// ID with TTL and size-bounded LRU eviction, deduplication of identical
+// in-flight requests, and background revalidation against the backend ETag.
+
+export interface SummaryData {
+  title: string
+  summary: string
+  key_points: string[]
+  code_samples: string[]
+  tags: string[]
+  source_url?: string
+}
+
+export interface CacheEntry {
+  questionId: string
+  data: SummaryData
+  etag: string | null
+  storedAt: number
+  lastAccess: number
+  size: number
+}
+
+interface SummarizeResult {
+  success: boolean
+  data?: SummaryData
+  error?: string
+}
+
+const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
+
+const DB_NAME = 'summary-cache'
+const STORE_NAME = 'summaries'
+const CACHE_TTL_MS = 24 * 60 * 60 * 1000
+const MAX_ENTRIES = 200
+const MAX_BYTES = 5 * 1024 * 1024
+
+// Mirrors extract_question_id in the backend's url_parser
+export const extractQuestionId = (url?: string | null) => {
+  const match = url?.match(/\/questions\/(\d+)/)
+  return match ? match[1] : null
+}
+
+let dbPromise: Promise<IDBDatabase | null> | null = null
+
+const openDb = (): Promise<IDBDatabase | null> => {
+  if (typeof indexedDB === 'undefined') return Promise.resolve(null)
+
+  if (!dbPromise) {
+    dbPromise = new Promise((resolve) => {
+      const request = indexedDB.open(DB_NAME, 1)
+      request.onupgradeneeded = () => {
+        const store = request.result.createObjectStore(STORE_NAME, { keyPath: 'questionId' })
+        store.createIndex('lastAccess', 'lastAccess')
+      }
+      request.onsuccess = () => resolve(request.result)
+      // The cache is an optimization; without IndexedDB every read is a miss
+      request.onerror = () => resolve(null)
+    })
+  }
+  return dbPromise
+}
+
+const withStore = async <T>(
+  mode: IDBTransactionMode,
+  action: (store: IDBObjectStore) => IDBRequest<T>
+): Promise<T | undefined> => {
+  const db = await openDb()
+  if (!db) return undefined
+
+  return new Promise((resolve) => {
+    const request = action(db.transaction(STORE_NAME, mode).objectStore(STORE_NAME))
+    request.onsuccess = () => resolve(request.result)
+    request.onerror = () => resolve(undefined)
+  })
+}
+
+const getEntry = (questionId: string) =>
+  withStore<CacheEntry | undefined>('readonly', (store) => store.get(questionId))
+
+const putEntry = (entry: CacheEntry) =>
+  withStore('readwrite', (store) => store.put(entry))
+
+const deleteEntry = (questionId: string) =>
+  withStore('readwrite', (store) => store.delete(questionId))
+
+// Drop least recently used entries until the cache fits its bounds
+const evict = async () => {
+  const entries = await withStore<CacheEntry[]>('readonly', (store) => store.index('lastAccess').getAll())
+  if (!entries) return
+
+  let count = entries.length
+  let bytes = entries.reduce((total, entry) => total + entry.size, 0)
+  for (const entry of entries) {
+    if (count <= MAX_ENTRIES && bytes <= MAX_BYTES) break
+    await deleteEntry(entry.questionId)
+    count -= 1
+    bytes -= entry.size
+  }
+}
+
+export const storeSummary = async (questionId: string, data: SummaryData, etag: string | null = null) => {
+  const now = Date.now()
+  await putEntry({
+    questionId,
+    data,
+    etag,
+    storedAt: now,
+    lastAccess: now,
+    size: JSON.stringify(data).length,
+  })
+  await evict()
+}
+
+export const getCachedSummary = async (questionId: string): Promise<CacheEntry | null> => {
+  const entry = await getEntry(questionId)
+  if (!entry) return null
+
+  if (Date.now() - entry.storedAt > CACHE_TTL_MS) {
+    await deleteEntry(questionId)
+    return null
+  }
+
+  entry.lastAccess = Date.now()
+  await putEntry(entry)
+  return entry
+}
+
+const abortError = () => new DOMException('Aborted', 'AbortError')
+
+// In-flight requests shared by identical callers. The underlying fetch is
+// only aborted once every caller sharing it has aborted, so a caller that
+// supersedes an identical request must subscribe before aborting the old one.
+const inFlight = new Map<string, { promise: Promise<unknown>; controller: AbortController; subscribers: number }>()
+
+const dedupe = <T>(key: string, run: (signal: AbortSignal) => Promise<T>, signal?: AbortSignal): Promise<T> => {
+  if (signal?.aborted) return Promise.reject(abortError())
+
+  let shared = inFlight.get(key)
+  if (!shared || shared.controller.signal.aborted) {
+    const controller = new AbortController()
+    const promise = run(controller.signal)
+    const entry = { promise, controller, subscribers: 0 }
+    const cleanup = () => {
+      if (inFlight.get(key) === entry) inFlight.delete(key)
+    }
+    promise.then(cleanup, cleanup)
+    shared = entry
+    inFlight.set(key, shared)
+  }
+
+  const current = shared
+  current.subscribers += 1
+
+  return new Promise<T>((resolve, reject) => {
+    const onAbort = () => {
+      current.subscribers -= 1
+      if (current.subscribers === 0) current.controller.abort()
+      reject(abortError())
+    }
+
+    signal?.addEventListener('abort', onAbort, { once: true })
+
+    ;(current.promise as Promise<T>).then(
+      (result) => {
+        signal?.removeEventListener('abort', onAbort)
+        resolve(result)
+      },
+      (err) => {
+        signal?.removeEventListener('abort', onAbort)
+        reject(err)
+      }
+    )
+  })
+}
+
+export const fetchSummary = (url: string, question: string, signal?: AbortSignal): Promise<SummarizeResult> => {
+  const key = `summarize:${url || ''}:${question || ''}`
+
+  return dedupe(key, async (sharedSignal) => {
+    const response = await fetch(`${API_URL}/api/summarize`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        url: url || undefined,
+        question: question || undefined,
+      }),
+      signal: sharedSignal,
+    })
+
+    const result: SummarizeResult = await response.json()
+
+    const questionId = extractQuestionId(url)
+    if (result.success && result.data && questionId) {
+      await storeSummary(questionId, result.data, response.headers.get('ETag'))
+    }
+    return result
+  }, signal)
+}
+
+// Check a cached summary against the backend; returns the new data if it changed
+export const revalidateSummary = (entry: CacheEntry, signal?: AbortSignal): Promise<SummaryData | null> => {
+  return dedupe(`revalidate:${entry.questionId}`, async (sharedSignal) => {
+    const headers: Record<string, string> = {}
+    if (entry.etag) headers['If-None-Match'] = entry.etag
+
+    const response = await fetch(`${API_URL}/api/questions/${entry.questionId}/summary`, {
+      headers,
+      signal: sharedSignal,
+    })
+
+    if (response.status === 304) {
+      await putEntry({ ...entry, storedAt: Date.now() })
+      return null
+    }
+    if (!response.ok) return null
+
+    const data: SummaryData = await response.json()
+    const changed = JSON.stringify(data) !== JSON.stringify(entry.data)
+    await storeSummary(entry.questionId, data, response.headers.get('ETag'))
+    return changed ? data : null
+  }, signal)
+}
+
+export const isAbortError = (err: unknown) =>
+  err instanceof DOMException && err.name === 'AbortError'
@@ -1,60 +1,82 @@
 'use client'
 
-import { useState } from 'react'
+import { useState, useRef } from 'react'
 import Header from './components/Header'
 import InputForm from './components/InputForm'
 import SummaryDisplay from './components/SummaryDisplay'
 import ChatInterface from './components/ChatInterface'
 import LoadingSpinner from './components/LoadingSpinner'
 import DarkModeToggle from './components/DarkModeToggle'
-
-interface SummaryData {
-  title: string
-  summary: string
-  key_points: string[]
-  code_samples: string[]
-  tags: string[]
-  source_url?: string
-}
+import {
+  SummaryData,
+  extractQuestionId,
+  fetchSummary,
+  getCachedSummary,
+  isAbortError,
+  revalidateSummary,
+} from './lib/summaryCache'
 
 export default function Home() {
   const [summary, setSummary] = useState<SummaryData | null>(null)
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState<string | null>(null)
   const [showChat, setShowChat] = useState(false)
+  const activeRequest = useRef<AbortController | null>(null)
 
   const handleSummarize = async (url: string, question: string) => {
+    // A new submit supersedes whatever was still loading. The previous request
+    // is only aborted once this one has subscribed, so an identical in-flight
+    // request (e.g. a double submit) is shared instead of cancelled and re-sent.
+    const previous = activeRequest.current
+    const controller = new AbortController()
+    activeRequest.current = controller
+    const isCurrent = () => activeRequest.current === controller
+
     setLoading(true)
     setError(null)
     setSummary(null)
     setShowChat(false)
 
     try {
-      const apiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
-      
-      const response = await fetch(`${apiUrl}/api/summarize`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          url: url || undefined,
-          question: question || undefined,
-        }),
-      })
+      const questionId = url ? extractQuestionId(url) : null
+      const cached = questionId ? await getCachedSummary(questionId) : null
+      if (!isCurrent()) return
 
-      const data = await response.json()
+      if (cached) {
+        // Show the cached summary instantly, then check it is still current
+        setSummary(cached.data)
+        setLoading(false)
 
-      if (data.success) {
+        revalidateSummary(cached, controller.signal)
+          .then((updated) => {
+            if (updated && isCurrent()) setSummary(updated)
+          })
+          .catch(() => {
+            // Keep showing the cached summary
+          })
+        previous?.abort()
+        return
+      }
+
+      const pending = fetchSummary(url, question, controller.signal)
+      previous?.abort()
+      const data = await pending
+      if (!isCurrent()) return
+
+      if (data.success && data.data) {
         setSummary(data.data)
       } else {
         setError(data.error || 'Failed to generate summary')
       }
     } catch (err) {
+      if (isAbortError(err) || !isCurrent()) return
       setError('Network error. Please check your connection and try again.')
       console.error('Error:', err)
     } finally {
-      setLoading(false)
+      previous?.abort()
+      if (isCurrent()) {
+        setLoading(false)
+      }
     }
   }
 
@@ -114,6 +136,7 @@ export default function Home() {
             <div className="animate-slide-up">
               <ChatInterface 
                 initialContext={`Question: ${summary.title}\nSummary: ${summary.summary}`}
+                questionId={extractQuestionId(summary.source_url)}
               />
             </div>
           )}